@@ -5,11 +5,16 @@ With privacy protection, authentication, and audit logging.
 """
 import os
 import json
+import asyncio
+import hashlib
 import logging
+import orjson
+from functools import lru_cache
 from datetime import datetime, timedelta
 from uuid import UUID, uuid4
-from fastapi import FastAPI, HTTPException, Depends, Security, WebSocket, WebSocketDisconnect, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, Security, WebSocket, WebSocketDisconnect, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict
 from dotenv import load_dotenv
@@ -17,12 +22,13 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Setup logging
-logging.basicConfig(level=logging.INFO)
+from logging_setup import setup_logging
+setup_logging(logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Import RAG components
 from orchestration.hybrid_answer import answer_query, answer_query_with_context
-from retrieval.semantic_search import semantic_search, semantic_search_with_scores, load_vector_store
+from retrieval.semantic_search import semantic_search, semantic_search_with_scores, cached_semantic_search, load_vector_store
 from ingestion.deal_ingestion import ingest_deal_to_vector_store
 from llm.talking_points import generate_talking_points_from_query
 from llm.credible_references import get_credible_references_for_deal
@@ -43,9 +49,21 @@ from models.call import (
 )
 from storage import get_redis_client, get_call_repository
 from websocket import get_connection_manager, get_live_call_handler
-from summarization import generate_call_summary, extract_action_items
+from summarization import generate_call_summary, stream_call_summary
 
-app = FastAPI(title="DealSense AI API", version="1.0.0")
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that encodes with orjson (C) instead of json.dumps"""
+    
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+app = FastAPI(
+    title="DealSense AI API",
+    version="1.0.0",
+    default_response_class=FastJSONResponse
+)
 
 # CORS middleware - Restricted to known origins
 ALLOWED_ORIGINS = [
@@ -121,6 +139,11 @@ class Deal(BaseModel):
     dealValue: str
     duration: str
 
+    class Config:
+        # Deals are static reference data, built once at import
+        frozen = True
+        extra = "forbid"
+
 class QueryRequest(BaseModel):
     query: str
 
@@ -272,15 +295,63 @@ MOCK_DEALS = [
     ),
 ]
 
+# During-call context and suggestions (for DuringCall tab)
+DURING_CALL_CONTEXT = [
+    {
+        "id": 1,
+        "title": "Trade Finance Capabilities",
+        "description": "DXC Trade Finance solution overview",
+        "industry": "Banking & Financial Services",
+        "teamSize": "10 members",
+        "budget": "$1.5M",
+        "timeline": "12 months",
+        "status": "Active",
+        "caseStudy": "Trade finance implementation with AI capabilities",
+        "keyHighlights": ["Real-time monitoring", "AI analytics", "Compliance"],
+        "dealBreakers": ["Integration complexity"],
+        "successCriteria": ["Go-live within timeline", "User adoption > 80%"],
+    }
+]
+
+# The mock data never changes, so encode it once instead of on every request
+_MOCK_DEAL_JSON = [orjson.dumps(deal.model_dump()) for deal in MOCK_DEALS]
+MOCK_DEALS_JSON = b"[" + b",".join(_MOCK_DEAL_JSON) + b"]"
+DURING_CALL_CONTEXT_JSON = orjson.dumps(DURING_CALL_CONTEXT)
+
+# ETags for the static payloads, so clients can revalidate with a 304
+MOCK_DEALS_ETAG = f'"{hashlib.sha1(MOCK_DEALS_JSON).hexdigest()}"'
+DURING_CALL_CONTEXT_ETAG = f'"{hashlib.sha1(DURING_CALL_CONTEXT_JSON).hexdigest()}"'
+STATIC_CACHE_CONTROL = "public, max-age=3600"
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header names etag (weakly compared) or is *"""
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+def _static_json_response(request: Request, content: bytes, etag: str) -> Response:
+    """Serve a prebuilt JSON payload, or an empty 304 if the client has it"""
+    headers = {"ETag": etag, "Cache-Control": STATIC_CACHE_CONTROL}
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content, media_type="application/json", headers=headers)
+
+@lru_cache(maxsize=32)
+def _mock_deals_page(limit: int) -> bytes:
+    """JSON array of the first `limit` mock deals, built once per limit"""
+    return b"[" + b",".join(_MOCK_DEAL_JSON[:limit]) + b"]"
+
 # API Endpoints
 @app.get("/")
 def root():
     return {"message": "DealSense AI API", "status": "running"}
 
 @app.get("/api/deals", response_model=List[Deal])
-def get_deals():
+def get_deals(request: Request):
     """Get all available deals/case studies"""
-    return MOCK_DEALS
+    return _static_json_response(request, MOCK_DEALS_JSON, MOCK_DEALS_ETAG)
 
 @app.get("/api/active-deals")
 def get_active_deals(auth: Dict = Depends(verify_api_key)):
@@ -517,11 +588,11 @@ def delete_deal(deal_id: int, auth: Dict = Depends(verify_api_key)):
 def search_deals(q: str = "", limit: int = 10, auth: Dict = Depends(verify_api_key)):
     """Search deals using RAG semantic search"""
     if not q:
-        return MOCK_DEALS[:limit]
+        return Response(_mock_deals_page(limit), media_type="application/json")
     
     # Use RAG semantic search
     try:
-        results = semantic_search(q, k=limit)
+        results = cached_semantic_search(q, k=limit)
         search_results = []
         for i, doc in enumerate(results):
             search_results.append({
@@ -644,24 +715,9 @@ Keep it professional, concise, and actionable."""
         )
 
 @app.get("/api/during_call")
-def get_during_call():
+def get_during_call(request: Request):
     """Get during-call context and suggestions"""
-    return [
-        {
-            "id": 1,
-            "title": "Trade Finance Capabilities",
-            "description": "DXC Trade Finance solution overview",
-            "industry": "Banking & Financial Services",
-            "teamSize": "10 members",
-            "budget": "$1.5M",
-            "timeline": "12 months",
-            "status": "Active",
-            "caseStudy": "Trade finance implementation with AI capabilities",
-            "keyHighlights": ["Real-time monitoring", "AI analytics", "Compliance"],
-            "dealBreakers": ["Integration complexity"],
-            "successCriteria": ["Go-live within timeline", "User adoption > 80%"],
-        }
-    ]
+    return _static_json_response(request, DURING_CALL_CONTEXT_JSON, DURING_CALL_CONTEXT_ETAG)
 
 @app.get("/api/outlook/upcoming-meetings")
 def get_outlook_meetings():
@@ -923,6 +979,7 @@ async def websocket_call_endpoint(websocket: WebSocket, call_id: str):
     - transcript_chunk: Real-time transcript updates
     - query_response: Answer to push-to-talk query
     - status_update: Call status changes
+    - summary_partial: Summary field completed while streaming
     - summary_ready: Summary generation complete
     - error: Error messages
     """
@@ -1005,26 +1062,16 @@ async def end_call(call_id: str, background_tasks: BackgroundTasks, auth: Dict =
     # Schedule background summary generation
     async def generate_summary_task():
         try:
-            # Generate summary
-            summary_data = await generate_call_summary(full_transcript, call.deal_id)
-            
-            # Save summary
-            summary_create = CallSummaryCreate(
-                call_id=call_uuid,
-                executive_summary=summary_data.get("executive_summary", ""),
-                key_points=summary_data.get("key_points", []),
-                pain_points=summary_data.get("pain_points", []),
-                objections=summary_data.get("objections", []),
-                next_steps=summary_data.get("next_steps", []),
-                deal_health_score=summary_data.get("deal_health_score", 5),
-                deal_health_reason=summary_data.get("deal_health_reasoning", "")
+            # Generate and save summary and action items
+            summary_data = await generate_call_summary(
+                full_transcript,
+                account_name=call.account_name,
+                deal_id=call.deal_id,
+                duration_minutes=(call.duration_seconds or 0) // 60,
+            )
+            await asyncio.to_thread(
+                call_repository.save_generated_summary, call_uuid, summary_data
             )
-            call_repository.create_summary(summary_create)
-            
-            # Extract and save action items
-            action_items = await extract_action_items(full_transcript)
-            if action_items:
-                call_repository.create_action_items_batch(call_uuid, action_items)
             
             logger.info(f"Summary generated for call {call_id}")
         except Exception as e:
@@ -1063,18 +1110,18 @@ def get_call_transcript(
     call_uuid = UUID(call_id)
     call_repository = get_call_repository()
     
-    chunks = call_repository.get_transcript(call_uuid, start_time, end_time)
+    chunks = call_repository.get_transcript_raw(call_uuid, start_time, end_time)
     
     return {
         "call_id": call_id,
         "chunks": [
             {
-                "id": str(c.id),
-                "speaker": c.speaker,
-                "text": c.text,
-                "start_time": c.start_time,
-                "end_time": c.end_time,
-                "is_final": c.is_final,
+                "id": str(c["id"]),
+                "speaker": c["speaker"],
+                "text": c["text"],
+                "start_time": c["start_time"],
+                "end_time": c["end_time"],
+                "is_final": c.get("is_final", True),
             }
             for c in chunks
         ],
@@ -1094,7 +1141,8 @@ def get_call_summary(call_id: str, auth: Dict = Depends(verify_api_key)):
     if not summary:
         raise HTTPException(status_code=404, detail="Summary not found")
     
-    action_items = call_repository.get_action_items(call_uuid)
+    # Stored dicts serialize directly (date/enum values are handled by FastAPI)
+    action_items = call_repository.get_action_items_raw(call_uuid)
     
     return {
         "call_id": call_id,
@@ -1111,18 +1159,57 @@ def get_call_summary(call_id: str, auth: Dict = Depends(verify_api_key)):
         },
         "action_items": [
             {
-                "id": str(item.id),
-                "task": item.task,
-                "owner": item.owner,
-                "due_date": item.due_date.isoformat() if item.due_date else None,
-                "priority": item.priority.value,
-                "status": item.status.value,
+                "id": str(item["id"]),
+                "task": item["task"],
+                "owner": item.get("owner", "Seller"),
+                "due_date": item.get("due_date") or None,
+                "priority": item.get("priority", ActionItemPriority.MEDIUM),
+                "status": item.get("status", ActionItemStatus.PENDING),
             }
             for item in action_items
         ]
     }
 
 
+@app.post("/api/calls/{call_id}/summary/stream")
+async def stream_call_summary_events(call_id: str, auth: Dict = Depends(verify_api_key)):
+    """
+    Generate a summary for a call, streamed as Server-Sent Events.
+    
+    Emits `token` events with raw LLM output and `field` events as each
+    summary field completes, then a `final` event with the full summary
+    (which is also saved, as in end_call). A POST, since it runs the LLM
+    and writes the summary; read a stored summary with GET .../summary.
+    """
+    call_uuid = UUID(call_id)
+    call_repository = get_call_repository()
+    
+    call = call_repository.get_call(call_uuid)
+    if not call:
+        raise HTTPException(status_code=404, detail="Call not found")
+    
+    full_transcript = call_repository.get_full_transcript_text(call_uuid)
+    
+    async def event_stream():
+        async for event in stream_call_summary(
+            transcript=full_transcript,
+            account_name=call.account_name,
+            deal_id=call.deal_id,
+            duration_minutes=(call.duration_seconds or 0) // 60,
+        ):
+            if event["type"] == "final":
+                await asyncio.to_thread(
+                    call_repository.save_generated_summary, call_uuid, event["summary"]
+                )
+            yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/api/calls/{call_id}/query", response_model=CallQueryResponse)
 def query_during_call(
     call_id: str,
@@ -1,6 +1,194 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Optional, Type
+
+import httpx
+import openai
+import tiktoken
+from langchain_openai import ChatOpenAI
+from pydantic import BaseModel
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+LLM_MODEL = "gpt-4o-mini"
+
+# Account limits for LLM_MODEL; requests are paced to stay under them
+LLM_RATE_LIMIT_RPM = int(os.getenv("LLM_RATE_LIMIT_RPM", "3500"))
+LLM_RATE_LIMIT_TPM = int(os.getenv("LLM_RATE_LIMIT_TPM", "200000"))
+LLM_MAX_RETRIES = 3  # 429 backstop only, the limiter should prevent most
+
+# Shared connection pool so concurrent calls reuse TLS connections
+_http_async_client = httpx.AsyncClient(
+    limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+)
+
+# Shared deterministic LLM for summarization (use ainvoke from async code).
+# Client retries are disabled; 429s are retried with jitter in ainvoke_text.
+llm = ChatOpenAI(
+    model=LLM_MODEL,
+    temperature=0,
+    api_key=os.getenv("OPENAI_API_KEY"),
+    http_async_client=_http_async_client,
+    max_retries=0,
+)
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for requests per minute and tokens per minute.
+
+    Both buckets start full and refill continuously. acquire() waits until
+    there is room for one request and its estimated tokens, so bursts are
+    paced below the limits instead of being rejected with 429s.
+    """
+
+    def __init__(self, rpm: int = LLM_RATE_LIMIT_RPM, tpm: int = LLM_RATE_LIMIT_TPM):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        """Top up both buckets for the time elapsed since the last refill"""
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    @asynccontextmanager
+    async def acquire(self, estimated_tokens: int = 0):
+        """Wait for capacity for one request of estimated_tokens"""
+        estimated_tokens = min(estimated_tokens, self.tpm)
+        # Waiters queue on the lock, so capacity is handed out in order
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._requests >= 1 and self._tokens >= estimated_tokens:
+                    self._requests -= 1
+                    self._tokens -= estimated_tokens
+                    break
+                wait = max(
+                    (1 - self._requests) * 60 / self.rpm,
+                    (estimated_tokens - self._tokens) * 60 / self.tpm,
+                )
+                await asyncio.sleep(wait)
+        yield
+
+
+# Lazy initialization of the rate limiter and tokenizer
+_limiter: Optional[RateLimiter] = None
+_encoding: Optional[tiktoken.Encoding] = None
+_encoding_failed = False
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get or create the shared LLM rate limiter"""
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter()
+    return _limiter
+
+
+def _get_encoding() -> Optional[tiktoken.Encoding]:
+    """Get the tokenizer for LLM_MODEL, or None if it can't be loaded"""
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        try:
+            _encoding = tiktoken.encoding_for_model(LLM_MODEL)
+        except Exception as e:
+            # Don't retry the download on every call; fall back to chars/4
+            logger.warning(f"Could not load tokenizer for {LLM_MODEL}: {e}")
+            _encoding_failed = True
+    return _encoding
+
+
+@lru_cache(maxsize=256)
+def estimate_tokens(prompt: str) -> int:
+    """Estimate prompt tokens with tiktoken (cached per prompt)"""
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(prompt) // 4
+    return len(encoding.encode(prompt))
+
+
+def json_schema_format(schema: Type[BaseModel]) -> dict:
+    """OpenAI structured output response_format for a pydantic model"""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": schema.__name__,
+            "strict": True,
+            "schema": schema.model_json_schema(),
+        },
+    }
+
+
+@lru_cache(maxsize=None)
+def _llm_for_schema(schema: Optional[Type[BaseModel]]):
+    """Shared LLM, constrained to return JSON matching schema if given"""
+    if schema is None:
+        return llm
+    return llm.bind(response_format=json_schema_format(schema))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Truncate text to at most max_tokens tokens of LLM_MODEL"""
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[:max_tokens * 4]
+    if len(text) <= max_tokens:
+        return text  # Every token is at least one character
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+
+async def ainvoke_text(prompt: str, schema: Optional[Type[BaseModel]] = None) -> str:
+    """
+    Invoke the shared LLM asynchronously and return the response text.
+    With a schema, the text is guaranteed to be JSON matching it.
+    """
+    model = _llm_for_schema(schema)
+    limiter = get_rate_limiter()
+    tokens = estimate_tokens(prompt)
+
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        try:
+            async with limiter.acquire(tokens):
+                response = await model.ainvoke(prompt)
+            return response.content
+        except openai.RateLimitError:
+            if attempt == LLM_MAX_RETRIES:
+                raise
+            delay = random.uniform(0, 2 ** attempt)
+            logger.warning(f"LLM rate limited, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+async def astream_text(prompt: str, schema: Optional[Type[BaseModel]] = None) -> AsyncIterator[str]:
+    """Stream the shared LLM's response text, paced by the rate limiter"""
+    model = _llm_for_schema(schema)
+    async with get_rate_limiter().acquire(estimate_tokens(prompt)):
+        async for chunk in model.astream(prompt):
+            if chunk.content:
+                yield chunk.content
+
+
 def generate_answer(query, context, source):
     """
     Later this will call Azure OpenAI / OpenAI / Ollama.
     For now, just format the response.
     """
-    return f"Answering the query: '{query}'\n\nBased on the context:\n{context}\n\n(Source: {source})"
\ No newline at end of file
+    return f"Answering the query: '{query}'\n\nBased on the context:\n{context}\n\n(Source: {source})"
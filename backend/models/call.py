@@ -4,7 +4,7 @@ Includes Call, Transcript, Summary, and ActionItem models
 """
 from datetime import datetime, date
 from enum import Enum
-from typing import List, Optional
+from typing import Any, List, Literal, Optional
 from uuid import UUID, uuid4
 from pydantic import BaseModel, Field
 
@@ -190,6 +190,67 @@ class ActionItem(BaseModel):
         }
 
 
+# ---------------------
+# LLM Output Schemas
+# ---------------------
+# Passed to the LLM as strict JSON schemas, so every field is required
+# (nullable where optional) and extra fields are forbidden. Field order
+# is the order the model generates them in.
+
+class ExtractedPainPoint(BaseModel):
+    """Pain point as generated by the LLM"""
+    description: str
+    severity: Literal["low", "medium", "high"]
+    context: Optional[str]
+
+    class Config:
+        extra = "forbid"
+
+
+class ExtractedObjection(BaseModel):
+    """Objection as generated by the LLM"""
+    description: str
+    category: Literal["pricing", "timeline", "features", "competition", "general"]
+    response_suggested: Optional[str]
+
+    class Config:
+        extra = "forbid"
+
+
+class ExtractedActionItem(BaseModel):
+    """Action item as generated by the LLM"""
+    task: str
+    owner: str
+    due_date: Optional[str]  # YYYY-MM-DD, or a phrase normalized later
+    priority: Literal["high", "medium", "low"]
+
+    class Config:
+        extra = "forbid"
+
+
+class ActionItemsSchema(BaseModel):
+    """LLM output for action item extraction"""
+    action_items: List[ExtractedActionItem]
+
+    class Config:
+        extra = "forbid"
+
+
+class SummarySchema(BaseModel):
+    """LLM output for a call summary with action items"""
+    executive_summary: str
+    key_points: List[str]
+    pain_points: List[ExtractedPainPoint]
+    objections: List[ExtractedObjection]
+    next_steps: str
+    deal_health_score: int
+    deal_health_reason: str
+    action_items: List[ExtractedActionItem]
+
+    class Config:
+        extra = "forbid"
+
+
 # ---------------------
 # WebSocket Message Models
 # ---------------------
@@ -204,8 +265,10 @@ class WSMessageType(str, Enum):
     
     # Server -> Client
     TRANSCRIPT_CHUNK = "transcript_chunk"
+    TRANSCRIPT_BATCH = "transcript_batch"
     QUERY_RESPONSE = "query_response"
     STATUS_UPDATE = "status_update"
+    SUMMARY_PARTIAL = "summary_partial"
     SUMMARY_READY = "summary_ready"
     ERROR = "error"
 
@@ -275,6 +338,13 @@ class WSStatusUpdateMessage(WSMessage):
     message: Optional[str] = None
 
 
+class WSSummaryPartialMessage(WSMessage):
+    """Server message with one completed field of a streaming summary"""
+    type: WSMessageType = WSMessageType.SUMMARY_PARTIAL
+    field: str
+    value: Any
+
+
 class WSSummaryReadyMessage(WSMessage):
     """Server message indicating summary is ready"""
     type: WSMessageType = WSMessageType.SUMMARY_READY
@@ -2,6 +2,7 @@ from langchain_community.vectorstores import FAISS
 from ingestion.vector_store import TfidfEmbeddings
 import os
 import pickle
+from functools import lru_cache
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 VECTOR_DB_PATH = os.path.join(BASE_DIR, "vector_store", "dealsense_faiss")
@@ -19,11 +20,45 @@ def load_vector_store():
         allow_dangerous_deserialization=True
     )
 
+# Loaded store shared by searches, with the file mtimes it was loaded at
+_cached_store = None
+_cached_mtimes = None
+
+def _store_mtimes():
+    return tuple(
+        os.stat(os.path.join(VECTOR_DB_PATH, name)).st_mtime_ns
+        for name in ("index.faiss", "index.pkl", "tfidf.pkl")
+    )
+
+def get_vector_store():
+    """
+    Load the vector store once and reuse it across searches.
+    Reloads when ingestion saves new files (checked with one stat per file).
+    """
+    global _cached_store, _cached_mtimes
+    mtimes = _store_mtimes()
+    if _cached_store is None or mtimes != _cached_mtimes:
+        _cached_store = load_vector_store()
+        _cached_mtimes = mtimes
+    return _cached_store
+
 def semantic_search(query, k=3):
-    vector_db = load_vector_store()
+    vector_db = get_vector_store()
     return vector_db.similarity_search(query, k=k)
 
+@lru_cache(maxsize=512)
+def _cached_search(query, k, mtimes):
+    return tuple(get_vector_store().similarity_search(query, k=k))
+
+def cached_semantic_search(query, k=3):
+    """
+    semantic_search for repeated queries: results are kept per (query, k)
+    until the store files change. The TF-IDF vectorizer lowercases, so
+    case and surrounding whitespace don't affect the key.
+    """
+    return list(_cached_search(query.strip().lower(), k, _store_mtimes()))
+
 def semantic_search_with_scores(query, k=3):
     """Returns list of (document, score) tuples. Lower score = more similar."""
-    vector_db = load_vector_store()
+    vector_db = get_vector_store()
     return vector_db.similarity_search_with_score(query, k=k)
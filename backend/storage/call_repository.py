@@ -5,8 +5,12 @@ Uses JSON file storage for simplicity (can be upgraded to PostgreSQL).
 import os
 import json
 import logging
+import functools
+import threading
+from bisect import bisect_left, bisect_right, insort
+from operator import itemgetter
 from datetime import datetime, date, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Set
 from uuid import UUID, uuid4
 
 from models.call import (
@@ -33,6 +37,16 @@ TRANSCRIPTS_FILE = os.path.join(DATA_DIR, "transcripts.json")
 SUMMARIES_FILE = os.path.join(DATA_DIR, "call_summaries.json")
 ACTION_ITEMS_FILE = os.path.join(DATA_DIR, "action_items.json")
 
+# Sort key for the per-call transcript index
+_start_time_key = itemgetter("start_time")
+
+
+def _uuid_key(value: Any) -> int:
+    """Integer index key for a UUID or its string form (cheaper to hash than str)"""
+    if isinstance(value, UUID):
+        return value.int
+    return UUID(str(value)).int
+
 
 class JSONEncoder(json.JSONEncoder):
     """Custom JSON encoder for UUID, datetime, date"""
@@ -66,15 +80,36 @@ def _save_json(filepath: str, data: List[Dict]) -> None:
         json.dump(data, f, indent=2, cls=JSONEncoder)
 
 
+def _synchronized(method):
+    """Run a CallRepository method under the repository lock"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class CallRepository:
     """
     Repository for managing calls, transcripts, summaries, and action items.
     Uses JSON file storage with in-memory caching.
+    
+    Call, transcript and action item records are validated once when loaded
+    (and on every write), so the cached dicts always hold native types and
+    read paths can build models with model_construct() instead of re-validating.
+    
+    Public methods hold a re-entrant lock, so the lazy caches and JSON files
+    stay consistent when the repository is used from worker threads.
     """
     
     def __init__(self):
+        self._lock = threading.RLock()
         self._calls_cache: Optional[List[Dict]] = None
+        # UUID.int -> call dict
+        self._calls_by_id: Optional[Dict[int, Dict]] = None
         self._transcripts_cache: Optional[List[Dict]] = None
+        # UUID.int of call_id -> transcript dicts kept sorted by start_time
+        self._transcripts_by_call: Optional[Dict[int, List[Dict]]] = None
         self._summaries_cache: Optional[List[Dict]] = None
         self._action_items_cache: Optional[List[Dict]] = None
     
@@ -85,7 +120,7 @@ class CallRepository:
     def _get_calls(self) -> List[Dict]:
         """Get calls with caching"""
         if self._calls_cache is None:
-            self._calls_cache = _load_json(CALLS_FILE)
+            self._calls_cache = [Call(**c).dict() for c in _load_json(CALLS_FILE)]
         return self._calls_cache
     
     def _save_calls(self) -> None:
@@ -93,6 +128,15 @@ class CallRepository:
         if self._calls_cache is not None:
             _save_json(CALLS_FILE, self._calls_cache)
     
+    def _get_calls_by_id(self) -> Dict[int, Dict]:
+        """Get call index keyed by UUID.int"""
+        if self._calls_by_id is None:
+            self._calls_by_id = {
+                _uuid_key(c.get("id")): c for c in self._get_calls()
+            }
+        return self._calls_by_id
+    
+    @_synchronized
     def create_call(self, call_create: CallCreate) -> Call:
         """Create a new call record"""
         calls = self._get_calls()
@@ -106,44 +150,47 @@ class CallRepository:
             status=CallStatus.IN_PROGRESS,
         )
         
-        calls.append(call.dict())
+        call_data = call.dict()
+        calls.append(call_data)
         self._calls_cache = calls
+        self._get_calls_by_id()[call.id.int] = call_data
         self._save_calls()
         
         logger.info(f"Created call {call.id} for deal {call.deal_id}")
         return call
     
+    @_synchronized
     def get_call(self, call_id: UUID) -> Optional[Call]:
         """Get a call by ID"""
-        calls = self._get_calls()
-        for call_data in calls:
-            if str(call_data.get("id")) == str(call_id):
-                return Call(**call_data)
+        call_data = self._get_calls_by_id().get(_uuid_key(call_id))
+        if call_data is not None:
+            return Call.model_construct(**call_data)
         return None
     
+    @_synchronized
     def get_calls_by_deal(self, deal_id: int) -> List[Call]:
         """Get all calls for a deal"""
         calls = self._get_calls()
         return [
-            Call(**c) for c in calls
+            Call.model_construct(**c) for c in calls
             if c.get("deal_id") == deal_id
         ]
     
+    @_synchronized
     def update_call(self, call_id: UUID, updates: Dict[str, Any]) -> Optional[Call]:
         """Update a call record"""
-        calls = self._get_calls()
-        
-        for i, call_data in enumerate(calls):
-            if str(call_data.get("id")) == str(call_id):
-                call_data.update(updates)
-                call_data["updated_at"] = datetime.utcnow().isoformat()
-                calls[i] = call_data
-                self._calls_cache = calls
-                self._save_calls()
-                return Call(**call_data)
+        call_data = self._get_calls_by_id().get(_uuid_key(call_id))
+        if call_data is None:
+            return None
         
-        return None
+        # Validate the merged record, then update the indexed dict in place
+        # (the index holds the same dict as the calls list)
+        call = Call(**{**call_data, **updates, "updated_at": datetime.utcnow()})
+        call_data.update(call.dict())
+        self._save_calls()
+        return call
     
+    @_synchronized
     def end_call(self, call_id: UUID) -> Optional[Call]:
         """Mark a call as ended and calculate duration"""
         call = self.get_call(call_id)
@@ -159,28 +206,46 @@ class CallRepository:
             "status": CallStatus.ENDED.value,
         })
     
+    @_synchronized
     def set_call_summarized(self, call_id: UUID) -> Optional[Call]:
         """Mark a call as summarized"""
         return self.update_call(call_id, {
             "status": CallStatus.SUMMARIZED.value,
         })
     
+    @_synchronized
     def delete_call(self, call_id: UUID) -> bool:
         """Delete a call and all related data"""
+        return self.bulk_delete_calls([call_id]) > 0
+    
+    @_synchronized
+    def bulk_delete_calls(self, call_ids: Iterable[UUID]) -> int:
+        """
+        Delete several calls and all related data.
+        Makes one pass (and one save) per file regardless of how many calls
+        are deleted. Returns the number of calls removed.
+        """
+        cid_set = {str(x) for x in call_ids}
+        if not cid_set:
+            return 0
+        
         calls = self._get_calls()
         original_length = len(calls)
         
-        self._calls_cache = [c for c in calls if str(c.get("id")) != str(call_id)]
+        self._calls_cache = [c for c in calls if str(c.get("id")) not in cid_set]
+        deleted = original_length - len(self._calls_cache)
         
-        if len(self._calls_cache) < original_length:
+        if deleted:
+            if self._calls_by_id is not None:
+                for cid in cid_set:
+                    self._calls_by_id.pop(UUID(cid).int, None)
             self._save_calls()
             # Also delete related transcripts, summaries, action items
-            self._delete_transcripts_for_call(call_id)
-            self._delete_summary_for_call(call_id)
-            self._delete_action_items_for_call(call_id)
-            return True
+            self._delete_transcripts_for_calls(cid_set)
+            self._delete_summaries_for_calls(cid_set)
+            self._delete_action_items_for_calls(cid_set)
         
-        return False
+        return deleted
     
     # ---------------------
     # Transcript Operations
@@ -189,7 +254,9 @@ class CallRepository:
     def _get_transcripts(self) -> List[Dict]:
         """Get transcripts with caching"""
         if self._transcripts_cache is None:
-            self._transcripts_cache = _load_json(TRANSCRIPTS_FILE)
+            self._transcripts_cache = [
+                TranscriptChunk(**t).dict() for t in _load_json(TRANSCRIPTS_FILE)
+            ]
         return self._transcripts_cache
     
     def _save_transcripts(self) -> None:
@@ -197,9 +264,23 @@ class CallRepository:
         if self._transcripts_cache is not None:
             _save_json(TRANSCRIPTS_FILE, self._transcripts_cache)
     
+    def _get_transcripts_by_call(self) -> Dict[int, List[Dict]]:
+        """Get per-call transcript index, each list sorted by start_time"""
+        if self._transcripts_by_call is None:
+            index: Dict[int, List[Dict]] = {}
+            for t in self._get_transcripts():
+                index.setdefault(_uuid_key(t.get("call_id")), []).append(t)
+            for chunks in index.values():
+                chunks.sort(key=_start_time_key)
+            self._transcripts_by_call = index
+        return self._transcripts_by_call
+    
+    @_synchronized
     def add_transcript_chunk(self, chunk_create: TranscriptChunkCreate) -> TranscriptChunk:
         """Add a transcript chunk"""
         transcripts = self._get_transcripts()
+        # Build the index before appending, or it would already hold the new chunk
+        by_call = self._get_transcripts_by_call()
         
         chunk = TranscriptChunk(
             id=uuid4(),
@@ -212,12 +293,19 @@ class CallRepository:
             is_final=chunk_create.is_final,
         )
         
-        transcripts.append(chunk.dict())
+        chunk_data = chunk.dict()
+        transcripts.append(chunk_data)
         self._transcripts_cache = transcripts
+        insort(
+            by_call.setdefault(chunk.call_id.int, []),
+            chunk_data,
+            key=_start_time_key,
+        )
         self._save_transcripts()
         
         return chunk
     
+    @_synchronized
     def get_transcript(
         self,
         call_id: UUID,
@@ -225,41 +313,59 @@ class CallRepository:
         end_time: float = None
     ) -> List[TranscriptChunk]:
         """Get transcript chunks for a call, optionally filtered by time"""
-        transcripts = self._get_transcripts()
-        
-        chunks = [
-            TranscriptChunk(**t) for t in transcripts
-            if str(t.get("call_id")) == str(call_id)
+        return [
+            TranscriptChunk.model_construct(**t)
+            for t in self.get_transcript_raw(call_id, start_time, end_time)
         ]
-        
-        # Filter by time range if specified
+    
+    @_synchronized
+    def get_transcript_raw(
+        self,
+        call_id: UUID,
+        start_time: float = None,
+        end_time: float = None
+    ) -> List[Dict]:
+        """
+        Get transcript chunks for a call as stored dicts, skipping model validation.
+        For internal callers that only read fields or serialize straight to JSON.
+        """
+        transcripts = self._get_transcripts_by_call().get(_uuid_key(call_id), [])
+        
+        # Index is sorted by start time, so narrow the range by bisection
+        lo = 0
+        hi = len(transcripts)
         if start_time is not None:
-            chunks = [c for c in chunks if c.start_time >= start_time]
+            lo = bisect_left(transcripts, start_time, key=_start_time_key)
         if end_time is not None:
-            chunks = [c for c in chunks if c.end_time <= end_time]
-        
-        # Sort by start time
-        chunks.sort(key=lambda c: c.start_time)
+            # A chunk starting after end_time cannot end before it
+            hi = bisect_right(transcripts, end_time, lo=lo, key=_start_time_key)
         
-        return chunks
+        return [
+            t for t in transcripts[lo:hi]
+            if end_time is None or t["end_time"] <= end_time
+        ]
     
+    @_synchronized
     def get_full_transcript_text(self, call_id: UUID) -> str:
         """Get full transcript as concatenated text with speaker labels"""
-        chunks = self.get_transcript(call_id)
-        
-        lines = []
-        for chunk in chunks:
-            lines.append(f"{chunk.speaker}: {chunk.text}")
-        
-        return "\n".join(lines)
+        # Per-call index is already sorted by start time
+        chunks = self._get_transcripts_by_call().get(_uuid_key(call_id), [])
+        return "\n".join(f"{c['speaker']}: {c['text']}" for c in chunks)
     
     def _delete_transcripts_for_call(self, call_id: UUID) -> None:
         """Delete all transcripts for a call"""
+        self._delete_transcripts_for_calls({str(call_id)})
+    
+    def _delete_transcripts_for_calls(self, cid_set: Set[str]) -> None:
+        """Delete all transcripts for a set of call IDs"""
         transcripts = self._get_transcripts()
         self._transcripts_cache = [
             t for t in transcripts
-            if str(t.get("call_id")) != str(call_id)
+            if str(t.get("call_id")) not in cid_set
         ]
+        if self._transcripts_by_call is not None:
+            for cid in cid_set:
+                self._transcripts_by_call.pop(UUID(cid).int, None)
         self._save_transcripts()
     
     # ---------------------
@@ -277,6 +383,7 @@ class CallRepository:
         if self._summaries_cache is not None:
             _save_json(SUMMARIES_FILE, self._summaries_cache)
     
+    @_synchronized
     def create_summary(self, summary_create: CallSummaryCreate) -> CallSummary:
         """Create a call summary"""
         summaries = self._get_summaries()
@@ -306,6 +413,7 @@ class CallRepository:
         logger.info(f"Created summary for call {summary.call_id}")
         return summary
     
+    @_synchronized
     def get_summary(self, call_id: UUID) -> Optional[CallSummary]:
         """Get summary for a call"""
         summaries = self._get_summaries()
@@ -316,6 +424,7 @@ class CallRepository:
         
         return None
     
+    @_synchronized
     def update_summary(self, call_id: UUID, updates: Dict[str, Any]) -> Optional[CallSummary]:
         """Update a call summary"""
         summaries = self._get_summaries()
@@ -335,10 +444,14 @@ class CallRepository:
     
     def _delete_summary_for_call(self, call_id: UUID) -> None:
         """Delete summary for a call"""
+        self._delete_summaries_for_calls({str(call_id)})
+    
+    def _delete_summaries_for_calls(self, cid_set: Set[str]) -> None:
+        """Delete summaries for a set of call IDs"""
         summaries = self._get_summaries()
         self._summaries_cache = [
             s for s in summaries
-            if str(s.get("call_id")) != str(call_id)
+            if str(s.get("call_id")) not in cid_set
         ]
         self._save_summaries()
     
@@ -349,7 +462,9 @@ class CallRepository:
     def _get_action_items(self) -> List[Dict]:
         """Get action items with caching"""
         if self._action_items_cache is None:
-            self._action_items_cache = _load_json(ACTION_ITEMS_FILE)
+            self._action_items_cache = [
+                ActionItem(**i).dict() for i in _load_json(ACTION_ITEMS_FILE)
+            ]
         return self._action_items_cache
     
     def _save_action_items(self) -> None:
@@ -357,6 +472,7 @@ class CallRepository:
         if self._action_items_cache is not None:
             _save_json(ACTION_ITEMS_FILE, self._action_items_cache)
     
+    @_synchronized
     def create_action_item(self, item_create: ActionItemCreate) -> ActionItem:
         """Create an action item"""
         items = self._get_action_items()
@@ -382,24 +498,36 @@ class CallRepository:
         
         return item
     
+    @_synchronized
     def get_action_items(self, call_id: UUID) -> List[ActionItem]:
         """Get action items for a call"""
+        return [
+            ActionItem.model_construct(**i)
+            for i in self.get_action_items_raw(call_id)
+        ]
+    
+    @_synchronized
+    def get_action_items_raw(self, call_id: UUID) -> List[Dict]:
+        """Get action items for a call as stored dicts, skipping model validation"""
         items = self._get_action_items()
+        call_id_str = str(call_id)
         return [
-            ActionItem(**i) for i in items
-            if str(i.get("call_id")) == str(call_id)
+            i for i in items
+            if str(i.get("call_id")) == call_id_str
         ]
     
+    @_synchronized
     def get_action_item(self, item_id: UUID) -> Optional[ActionItem]:
         """Get a specific action item"""
         items = self._get_action_items()
         
         for item_data in items:
             if str(item_data.get("id")) == str(item_id):
-                return ActionItem(**item_data)
+                return ActionItem.model_construct(**item_data)
         
         return None
     
+    @_synchronized
     def update_action_item(
         self,
         item_id: UUID,
@@ -412,15 +540,19 @@ class CallRepository:
             if str(item_data.get("id")) == str(item_id):
                 # Apply updates
                 update_dict = updates.dict(exclude_none=True)
-                item_data.update(update_dict)
-                item_data["updated_at"] = datetime.utcnow().isoformat()
-                items[i] = item_data
+                item = ActionItem(**{
+                    **item_data,
+                    **update_dict,
+                    "updated_at": datetime.utcnow(),
+                })
+                items[i] = item.dict()
                 self._action_items_cache = items
                 self._save_action_items()
-                return ActionItem(**item_data)
+                return item
         
         return None
     
+    @_synchronized
     def delete_action_item(self, item_id: UUID) -> bool:
         """Delete an action item"""
         items = self._get_action_items()
@@ -439,13 +571,18 @@ class CallRepository:
     
     def _delete_action_items_for_call(self, call_id: UUID) -> None:
         """Delete all action items for a call"""
+        self._delete_action_items_for_calls({str(call_id)})
+    
+    def _delete_action_items_for_calls(self, cid_set: Set[str]) -> None:
+        """Delete all action items for a set of call IDs"""
         items = self._get_action_items()
         self._action_items_cache = [
             i for i in items
-            if str(i.get("call_id")) != str(call_id)
+            if str(i.get("call_id")) not in cid_set
         ]
         self._save_action_items()
     
+    @_synchronized
     def create_action_items_batch(
         self,
         call_id: UUID,
@@ -466,14 +603,45 @@ class CallRepository:
         
         return created_items
     
+    @_synchronized
+    def save_generated_summary(
+        self,
+        call_id: UUID,
+        summary_data: Dict[str, Any]
+    ) -> CallSummary:
+        """
+        Save an LLM-generated summary and its action items for a call.
+        Summaries are upserted, action items are not; the first set is kept
+        so regenerating a summary doesn't duplicate them.
+        """
+        summary = self.create_summary(CallSummaryCreate(
+            call_id=call_id,
+            executive_summary=summary_data.get("executive_summary", ""),
+            key_points=summary_data.get("key_points", []),
+            pain_points=summary_data.get("pain_points", []),
+            objections=summary_data.get("objections", []),
+            next_steps=summary_data.get("next_steps", ""),
+            deal_health_score=summary_data.get("deal_health_score", 5),
+            deal_health_reason=summary_data.get("deal_health_reason", ""),
+        ))
+        
+        action_items = summary_data.get("action_items", [])
+        if action_items and not self.get_action_items_raw(call_id):
+            self.create_action_items_batch(call_id, action_items)
+        
+        return summary
+    
     # ---------------------
     # Cache Management
     # ---------------------
     
+    @_synchronized
     def clear_cache(self) -> None:
         """Clear all caches to force reload from files"""
         self._calls_cache = None
+        self._calls_by_id = None
         self._transcripts_cache = None
+        self._transcripts_by_call = None
         self._summaries_cache = None
         self._action_items_cache = None
 
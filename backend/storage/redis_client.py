@@ -4,9 +4,12 @@ Stores last 2 minutes of transcript for context-aware queries.
 """
 import os
 import json
+import time
 import logging
+from collections import deque
+from itertools import islice
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any
 from uuid import UUID
 import redis
 from dotenv import load_dotenv
@@ -19,6 +22,8 @@ logger = logging.getLogger(__name__)
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 TRANSCRIPT_BUFFER_TTL = 3600  # 1 hour after call ends
 TRANSCRIPT_WINDOW_SECONDS = 120  # 2 minutes sliding window
+IN_MEMORY_LIST_MAXLEN = 100_000  # Hard cap for in-memory fallback lists
+IN_MEMORY_SWEEP_INTERVAL = 60  # Seconds between in-memory expired-key sweeps
 
 
 class RedisClient:
@@ -27,9 +32,11 @@ class RedisClient:
     
     Key patterns:
     - call:{call_id}:transcript_buffer - List of transcript chunks (last 2 min)
+    - call:{call_id}:latest_end_time - Latest end time of any buffered chunk
     - call:{call_id}:status - Current call status
     - call:{call_id}:metadata - Call metadata (deal_id, account, etc.)
     - active_calls:{user_id} - Set of active call IDs for user
+    - llm_cache:{prompt_hash} - Cached LLM response text
     """
     
     def __init__(self, redis_url: str = None):
@@ -78,35 +85,75 @@ class RedisClient:
         Add a transcript chunk to the buffer.
         Maintains a sliding window of recent transcript.
         """
+        self.add_transcript_chunks(call_id, [chunk], max_chunks)
+    
+    def add_transcript_chunks(
+        self,
+        call_id: UUID,
+        chunks: List[Dict[str, Any]],
+        max_chunks: int = 100
+    ) -> None:
+        """
+        Add several transcript chunks to the buffer, in order.
+        All writes go out in one pipelined round trip.
+        """
+        if not chunks:
+            return
+        
         key = f"call:{call_id}:transcript_buffer"
-        chunk_json = json.dumps(chunk, default=str)
+        pipe = self.client.pipeline(transaction=False)
         
         # Add to list (right side)
-        self.client.rpush(key, chunk_json)
+        pipe.rpush(key, *(json.dumps(chunk, default=str) for chunk in chunks))
         
         # Trim to keep only last N chunks (approximate 2 min window)
-        self.client.ltrim(key, -max_chunks, -1)
+        pipe.ltrim(key, -max_chunks, -1)
         
         # Set TTL
-        self.client.expire(key, TRANSCRIPT_BUFFER_TTL)
+        pipe.expire(key, TRANSCRIPT_BUFFER_TTL)
+        
+        # Track the latest end time so readers don't have to decode the
+        # buffer. Chunks can arrive out of order, so keep the max.
+        end_times = [chunk["end_time"] for chunk in chunks if "end_time" in chunk]
+        if end_times:
+            time_key = f"call:{call_id}:latest_end_time"
+            latest = max(end_times)
+            stored = self.get_latest_end_time(call_id)
+            if stored is None or latest > stored:
+                pipe.set(time_key, str(latest))
+            pipe.expire(time_key, TRANSCRIPT_BUFFER_TTL)
+        
+        pipe.execute()
+    
+    def get_latest_end_time(self, call_id: UUID) -> Optional[float]:
+        """Get end time of the most recent transcript chunk, if any"""
+        value = self.client.get(f"call:{call_id}:latest_end_time")
+        return float(value) if value is not None else None
+    
+    def _get_raw_transcript_buffer(
+        self,
+        call_id: UUID,
+        last_n: int = None
+    ) -> List[str]:
+        """Get encoded transcript chunks from buffer"""
+        key = f"call:{call_id}:transcript_buffer"
+        
+        if last_n:
+            return self.client.lrange(key, -last_n, -1)
+        return self.client.lrange(key, 0, -1)
     
     def get_transcript_buffer(
         self,
         call_id: UUID,
         last_n: int = None
-    ) -> List[Dict[str, Any]]:
+    ) -> Iterator[Dict[str, Any]]:
         """
         Get transcript chunks from buffer.
         Returns last N chunks or all if not specified.
+        Chunks are decoded lazily as the iterator is consumed.
         """
-        key = f"call:{call_id}:transcript_buffer"
-        
-        if last_n:
-            chunks = self.client.lrange(key, -last_n, -1)
-        else:
-            chunks = self.client.lrange(key, 0, -1)
-        
-        return [json.loads(chunk) for chunk in chunks]
+        chunks = self._get_raw_transcript_buffer(call_id, last_n)
+        return (json.loads(chunk) for chunk in chunks)
     
     def get_recent_transcript_text(
         self,
@@ -117,20 +164,26 @@ class RedisClient:
         Get concatenated transcript text from last N seconds.
         Used for building context for RAG queries.
         """
-        chunks = self.get_transcript_buffer(call_id)
+        raw_chunks = self._get_raw_transcript_buffer(call_id)
         
-        if not chunks:
+        if not raw_chunks:
             return ""
         
         # Get current time reference (last chunk end time)
-        latest_time = max(chunk.get("end_time", 0) for chunk in chunks)
+        latest_time = self.get_latest_end_time(call_id)
+        if latest_time is None:
+            latest_time = max(
+                json.loads(chunk).get("end_time", 0) for chunk in raw_chunks
+            )
         cutoff_time = latest_time - window_seconds
         
-        # Filter chunks within window
-        recent_chunks = [
-            chunk for chunk in chunks
-            if chunk.get("start_time", 0) >= cutoff_time
-        ]
+        # Filter chunks within window. Chunks aren't always pushed in time
+        # order (see add_mock_transcript_chunk), so check every one.
+        recent_chunks = []
+        for raw in raw_chunks:
+            chunk = json.loads(raw)
+            if chunk.get("start_time", 0) >= cutoff_time:
+                recent_chunks.append(chunk)
         
         # Build transcript text with speaker labels
         lines = []
@@ -143,8 +196,8 @@ class RedisClient:
     
     def clear_transcript_buffer(self, call_id: UUID) -> None:
         """Clear transcript buffer for a call"""
-        key = f"call:{call_id}:transcript_buffer"
-        self.client.delete(key)
+        self.client.delete(f"call:{call_id}:transcript_buffer")
+        self.client.delete(f"call:{call_id}:latest_end_time")
     
     # ---------------------
     # Call Status Operations
@@ -197,6 +250,20 @@ class RedisClient:
         key = f"active_calls:{user_id}"
         return list(self.client.smembers(key))
     
+    # ---------------------
+    # LLM Response Cache
+    # ---------------------
+    
+    def get_llm_response(self, prompt_hash: str) -> Optional[str]:
+        """Get cached LLM response text"""
+        return self.client.get(f"llm_cache:{prompt_hash}")
+    
+    def set_llm_response(self, prompt_hash: str, response: str, ttl: int) -> None:
+        """Cache LLM response text"""
+        key = f"llm_cache:{prompt_hash}"
+        self.client.set(key, response)
+        self.client.expire(key, ttl)
+    
     # ---------------------
     # Cleanup
     # ---------------------
@@ -205,6 +272,7 @@ class RedisClient:
         """Remove all Redis data for a call"""
         keys = [
             f"call:{call_id}:transcript_buffer",
+            f"call:{call_id}:latest_end_time",
             f"call:{call_id}:status",
             f"call:{call_id}:metadata"
         ]
@@ -216,21 +284,40 @@ class InMemoryRedis:
     """
     In-memory fallback when Redis is not available.
     Useful for local development without Redis.
+    Honors expire(): expired keys are dropped when touched, and swept
+    every IN_MEMORY_SWEEP_INTERVAL seconds.
     """
     
     def __init__(self):
         self._data: Dict[str, Any] = {}
-        self._lists: Dict[str, List] = {}
+        self._lists: Dict[str, deque] = {}
         self._sets: Dict[str, set] = {}
         self._hashes: Dict[str, Dict] = {}
+        # key -> time.monotonic() deadline, for keys with a TTL
+        self._expires: Dict[str, float] = {}
+        self._next_sweep = 0.0
+    
+    def _expire_due(self, key: str) -> None:
+        """Drop key if its TTL has passed, and sweep other expired keys now and then"""
+        now = time.monotonic()
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= now:
+            self.delete(key)
+        if now >= self._next_sweep:
+            self._next_sweep = now + IN_MEMORY_SWEEP_INTERVAL
+            for expired in [k for k, t in self._expires.items() if t <= now]:
+                self.delete(expired)
     
     def ping(self) -> bool:
         return True
     
     def set(self, key: str, value: str) -> None:
+        self._expire_due(key)
         self._data[key] = value
+        self._expires.pop(key, None)  # SET clears any TTL, as in Redis
     
     def get(self, key: str) -> Optional[str]:
+        self._expire_due(key)
         return self._data.get(key)
     
     def delete(self, key: str) -> None:
@@ -238,55 +325,73 @@ class InMemoryRedis:
         self._lists.pop(key, None)
         self._sets.pop(key, None)
         self._hashes.pop(key, None)
+        self._expires.pop(key, None)
     
     def expire(self, key: str, ttl: int) -> None:
-        pass  # No-op for in-memory
+        self._expire_due(key)
+        if key in self._data or key in self._lists or key in self._sets or key in self._hashes:
+            self._expires[key] = time.monotonic() + ttl
+    
+    def pipeline(self, transaction: bool = True) -> "InMemoryPipeline":
+        return InMemoryPipeline(self)
     
-    def rpush(self, key: str, value: str) -> int:
+    def rpush(self, key: str, *values: str) -> int:
+        self._expire_due(key)
         if key not in self._lists:
-            self._lists[key] = []
-        self._lists[key].append(value)
+            self._lists[key] = deque(maxlen=IN_MEMORY_LIST_MAXLEN)
+        self._lists[key].extend(values)
         return len(self._lists[key])
     
     def lrange(self, key: str, start: int, end: int) -> List[str]:
+        self._expire_due(key)
         if key not in self._lists:
             return []
-        lst = self._lists[key]
+        dq = self._lists[key]
         if end == -1:
-            end = len(lst)
+            end = len(dq)
         else:
             end = end + 1
         if start < 0:
-            start = max(0, len(lst) + start)
-        return lst[start:end]
+            start = max(0, len(dq) + start)
+        return list(islice(dq, start, end))
     
     def ltrim(self, key: str, start: int, end: int) -> None:
+        self._expire_due(key)
         if key not in self._lists:
             return
-        lst = self._lists[key]
+        dq = self._lists[key]
+        if start < 0 and end == -1:
+            # Keep the last N items: pop from the left in place
+            while len(dq) > -start:
+                dq.popleft()
+            return
         if start < 0:
-            start = max(0, len(lst) + start)
+            start = max(0, len(dq) + start)
         if end == -1:
-            end = len(lst)
+            end = len(dq)
         else:
             end = end + 1
-        self._lists[key] = lst[start:end]
+        self._lists[key] = deque(islice(dq, start, end), maxlen=dq.maxlen)
     
     def sadd(self, key: str, value: str) -> int:
+        self._expire_due(key)
         if key not in self._sets:
             self._sets[key] = set()
         self._sets[key].add(value)
         return 1
     
     def srem(self, key: str, value: str) -> int:
+        self._expire_due(key)
         if key in self._sets:
             self._sets[key].discard(value)
         return 1
     
     def smembers(self, key: str) -> set:
+        self._expire_due(key)
         return self._sets.get(key, set())
     
     def hset(self, key: str, mapping: Dict = None, **kwargs) -> None:
+        self._expire_due(key)
         if key not in self._hashes:
             self._hashes[key] = {}
         if mapping:
@@ -294,9 +399,34 @@ class InMemoryRedis:
         self._hashes[key].update(kwargs)
     
     def hgetall(self, key: str) -> Dict:
+        self._expire_due(key)
         return self._hashes.get(key, {})
 
 
+
+class InMemoryPipeline:
+    """
+    Pipeline for InMemoryRedis: queues commands and runs them in order
+    on execute(), like redis-py's Pipeline.
+    """
+    
+    def __init__(self, client: InMemoryRedis):
+        self._client = client
+        self._commands: List[tuple] = []
+    
+    def __getattr__(self, name: str):
+        method = getattr(self._client, name)
+        
+        def queue(*args, **kwargs) -> "InMemoryPipeline":
+            self._commands.append((method, args, kwargs))
+            return self
+        return queue
+    
+    def execute(self) -> List[Any]:
+        commands, self._commands = self._commands, []
+        return [method(*args, **kwargs) for method, args, kwargs in commands]
+
+
 # Singleton instance
 _redis_client: Optional[RedisClient] = None
 
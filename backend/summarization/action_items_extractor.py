@@ -2,26 +2,33 @@
 Action Items Extractor for Live Call Assistant.
 Uses LLM to extract actionable tasks from call transcripts.
 """
-import os
-import json
+import re
 import logging
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
-from langchain_openai import ChatOpenAI
-from dotenv import load_dotenv
 
-from .prompt_templates import ACTION_ITEMS_PROMPT_TEMPLATE
+from llm.llm_client import truncate_to_tokens
+from models.call import ActionItemsSchema
 
-load_dotenv()
+from .llm_cache import cached_llm_call
+from .prompt_templates import ACTION_ITEMS_PROMPT_TEMPLATE
 
 logger = logging.getLogger(__name__)
 
-# Initialize LLM
-llm = ChatOpenAI(
-    model="gpt-4o-mini",
-    temperature=0,
-    api_key=os.getenv("OPENAI_API_KEY")
+# Common action item indicators for the transcript fallback extractor.
+# Unanchored, so inflections like "scheduled" or "next steps" still match.
+_INDICATOR_RE = re.compile(
+    r"will send|will provide|follow up|schedule|send you|get back to|prepare"
+    r"|create|draft|review|action item|next step|to do|need to",
+    re.IGNORECASE,
 )
+_DAYS_RE = re.compile(r"(\d+)\s*day")
+ACTION_ITEMS_TRANSCRIPT_TOKENS = 6000  # Transcript budget in the prompt
+
+# Below these, a transcript isn't worth an LLM call (see _is_conversational)
+MIN_SPEAKER_TURNS = 2
+MIN_WORDS = 50
 
 
 async def extract_action_items(
@@ -50,90 +57,113 @@ async def extract_action_items(
         logger.warning("Transcript too short for action items extraction")
         return _generate_default_action_item(account_name)
     
+    if not _is_conversational(transcript):
+        logger.info("Transcript is not conversational, skipping action items LLM call")
+        return _generate_default_action_item(account_name)
+    
     # Use current date if not provided
     if not call_date:
         call_date = datetime.utcnow().strftime("%Y-%m-%d")
     
     # Build the prompt
-    prompt = ACTION_ITEMS_PROMPT_TEMPLATE.format(
-        account_name=account_name,
-        seller_name=seller_name,
-        call_date=call_date,
-        transcript=transcript[:10000],  # Limit transcript length
-    )
+    prompt = _build_action_items_prompt(transcript, account_name, seller_name, call_date)
     
     try:
         # Generate action items
-        response = llm.invoke(prompt)
-        response_text = response.content.strip()
-        
-        # Parse JSON response
-        action_items = _parse_action_items_response(response_text, call_date)
-        
-        # Ensure we have at least one action item
-        if not action_items:
-            action_items = _generate_default_action_item(account_name)
-        
-        # Limit to 10 action items
-        action_items = action_items[:10]
+        response = await cached_llm_call(
+            prompt,
+            truncate_to_tokens(transcript, ACTION_ITEMS_TRANSCRIPT_TOKENS),  # As sent in the prompt
+            namespace="action_items",
+            params={
+                "account_name": account_name,
+                "seller_name": seller_name,
+                "call_date": call_date,
+            },
+            schema=ActionItemsSchema,
+        )
+        action_items = _finalize_action_items(response, call_date, account_name)
         
         logger.info(f"Extracted {len(action_items)} action items")
         return action_items
         
     except Exception as e:
         logger.error(f"Error extracting action items: {e}", exc_info=True)
-        return _generate_default_action_item(account_name)
+        # Last resort: pick commitment phrases out of the transcript itself
+        action_items = _extract_action_items_from_text(transcript, call_date)
+        return action_items or _generate_default_action_item(account_name)
+
+
+def _is_conversational(transcript: str) -> bool:
+    """
+    Cheap check that a transcript has speaker turns and enough words to
+    be worth an LLM call. Speaker labels are "Name: text", so colons
+    approximate turns.
+    """
+    return (
+        transcript.count(":") >= MIN_SPEAKER_TURNS
+        and transcript.count(" ") >= MIN_WORDS
+    )
+
+
+def _build_action_items_prompt(
+    transcript: str,
+    account_name: str,
+    seller_name: str,
+    call_date: str
+) -> str:
+    """Build the action items prompt for a transcript"""
+    return ACTION_ITEMS_PROMPT_TEMPLATE.substitute(
+        account_name=account_name,
+        seller_name=seller_name,
+        call_date=call_date,
+        transcript=truncate_to_tokens(transcript, ACTION_ITEMS_TRANSCRIPT_TOKENS),
+    )
+
+
+def _finalize_action_items(
+    response_text: str,
+    call_date: str,
+    account_name: str
+) -> List[Dict[str, Any]]:
+    """Parse an LLM response into at most 10 action items (at least one)"""
+    action_items = _parse_action_items_response(response_text, call_date)
+    
+    # Ensure we have at least one action item
+    if not action_items:
+        action_items = _generate_default_action_item(account_name)
+    
+    # Limit to 10 action items
+    return action_items[:10]
 
 
 def _parse_action_items_response(response_text: str, call_date: str) -> List[Dict[str, Any]]:
     """
-    Parse LLM response into action items list.
-    Handles JSON extraction from potentially noisy output.
+    Parse a structured output response into action items list.
+    Raises pydantic.ValidationError if it doesn't match ActionItemsSchema.
     """
-    try:
-        # Handle markdown code blocks
-        if "```json" in response_text:
-            json_start = response_text.index("```json") + 7
-            json_end = response_text.index("```", json_start)
-            response_text = response_text[json_start:json_end].strip()
-        elif "```" in response_text:
-            json_start = response_text.index("```") + 3
-            json_end = response_text.index("```", json_start)
-            response_text = response_text[json_start:json_end].strip()
-        
-        # Find JSON object bounds
-        if "{" in response_text:
-            start = response_text.index("{")
-            depth = 0
-            end = start
-            for i, char in enumerate(response_text[start:], start):
-                if char == "{":
-                    depth += 1
-                elif char == "}":
-                    depth -= 1
-                    if depth == 0:
-                        end = i + 1
-                        break
-            response_text = response_text[start:end]
-        
-        data = json.loads(response_text)
-        raw_items = data.get("action_items", [])
-        
-        # Normalize and validate action items
-        action_items = []
-        for item in raw_items:
-            normalized = _normalize_action_item(item, call_date)
-            if normalized:
-                action_items.append(normalized)
-        
-        return action_items
-        
-    except json.JSONDecodeError as e:
-        logger.warning(f"Failed to parse action items JSON: {e}")
-        return _extract_action_items_from_text(response_text, call_date)
+    data = ActionItemsSchema.model_validate_json(response_text).model_dump()
+    return _normalize_action_items(data["action_items"], call_date)
+
+
+def _normalize_action_items(raw_items: List, call_date: str) -> List[Dict[str, Any]]:
+    """Normalize and validate a list of raw action items"""
+    # Resolve the call date once for every item's due date
+    base_date = _parse_base_date(call_date)
+    default_due_date = _calculate_default_due_date(base_date)
+    
+    action_items = []
+    for item in raw_items:
+        normalized = _normalize_action_item(item, base_date, default_due_date)
+        if normalized:
+            action_items.append(normalized)
+    return action_items
 
 
-def _normalize_action_item(item: Dict, call_date: str) -> Optional[Dict[str, Any]]:
+def _normalize_action_item(
+    item: Dict,
+    base_date: datetime,
+    default_due_date: str
+) -> Optional[Dict[str, Any]]:
     """
     Normalize an action item to consistent format.
     """
@@ -141,7 +171,7 @@ def _normalize_action_item(item: Dict, call_date: str) -> Optional[Dict[str, Any
         return {
             "task": item,
             "owner": "Seller",
-            "due_date": _calculate_default_due_date(call_date),
+            "due_date": default_due_date,
             "priority": "medium"
         }
     
@@ -160,7 +190,7 @@ def _normalize_action_item(item: Dict, call_date: str) -> Optional[Dict[str, Any
     # Normalize due date
     due_date = item.get("due_date")
     if due_date:
-        due_date = _parse_due_date(due_date, call_date)
+        due_date = _parse_due_date(due_date, base_date)
     else:
         due_date = None  # Don't assign default, let caller decide
     
@@ -177,15 +207,30 @@ def _normalize_action_item(item: Dict, call_date: str) -> Optional[Dict[str, Any
     }
 
 
-def _parse_due_date(due_date: Any, call_date: str) -> Optional[str]:
+def _parse_base_date(call_date: str) -> datetime:
+    """Parse the call date (YYYY-MM-DD), falling back to today (UTC)"""
+    try:
+        return datetime.strptime(call_date, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _parse_due_date(due_date: Any, base_date: datetime) -> Optional[str]:
     """
     Parse due date from various formats.
     """
     if due_date is None:
         return None
     
-    due_date_str = str(due_date).lower().strip()
-    
+    return _parse_due_date_str(str(due_date).lower().strip(), base_date)
+
+
+@lru_cache(maxsize=4096)
+def _parse_due_date_str(due_date_str: str, base_date: datetime) -> Optional[str]:
+    """
+    Parse a normalized due date string relative to base_date.
+    Cached since phrases like "next week" repeat across items and calls.
+    """
     # Handle null/none values
     if due_date_str in ["null", "none", "n/a", ""]:
         return None
@@ -198,11 +243,6 @@ def _parse_due_date(due_date: Any, call_date: str) -> Optional[str]:
         pass
     
     # Handle relative dates
-    try:
-        base_date = datetime.strptime(call_date, "%Y-%m-%d")
-    except ValueError:
-        base_date = datetime.utcnow()
-    
     if "today" in due_date_str:
         return base_date.strftime("%Y-%m-%d")
     elif "tomorrow" in due_date_str:
@@ -223,8 +263,7 @@ def _parse_due_date(due_date: Any, call_date: str) -> Optional[str]:
         return (base_date + timedelta(days=days_until_monday)).strftime("%Y-%m-%d")
     
     # Try to extract days
-    import re
-    match = re.search(r'(\d+)\s*day', due_date_str)
+    match = _DAYS_RE.search(due_date_str)
     if match:
         days = int(match.group(1))
         return (base_date + timedelta(days=days)).strftime("%Y-%m-%d")
@@ -232,75 +271,47 @@ def _parse_due_date(due_date: Any, call_date: str) -> Optional[str]:
     return None
 
 
-def _calculate_default_due_date(call_date: str) -> str:
+def _calculate_default_due_date(base_date: datetime) -> str:
     """
     Calculate default due date (+7 days from call).
     """
-    try:
-        base_date = datetime.strptime(call_date, "%Y-%m-%d")
-    except ValueError:
-        base_date = datetime.utcnow()
-    
     return (base_date + timedelta(days=7)).strftime("%Y-%m-%d")
 
 
 def _extract_action_items_from_text(text: str, call_date: str) -> List[Dict[str, Any]]:
     """
-    Fallback extractor when JSON parsing fails.
-    Uses simple text analysis to find action items.
+    Fallback extractor when the LLM call fails.
+    Uses simple text analysis to find action items in the transcript.
     """
+    default_due_date = _calculate_default_due_date(_parse_base_date(call_date))
+    seen = set()
     action_items = []
     
-    # Common action item indicators
-    indicators = [
-        "will send",
-        "will provide",
-        "follow up",
-        "schedule",
-        "send you",
-        "get back to",
-        "prepare",
-        "create",
-        "draft",
-        "review",
-        "action item",
-        "next step",
-        "to do",
-        "need to",
-    ]
-    
-    lines = text.split("\n")
-    for line in lines:
-        line_lower = line.lower()
+    for line in text.split("\n"):
+        if not _INDICATOR_RE.search(line):
+            continue
         
-        for indicator in indicators:
-            if indicator in line_lower:
-                # Clean up the line
-                task = line.strip()
-                if task.startswith("-") or task.startswith("•"):
-                    task = task[1:].strip()
-                if task.startswith("*"):
-                    task = task[1:].strip()
-                
-                if len(task) > 10:  # Minimum task length
-                    action_items.append({
-                        "task": task[:200],  # Limit length
-                        "owner": "Seller",
-                        "due_date": _calculate_default_due_date(call_date),
-                        "priority": "medium"
-                    })
-                break
-    
-    # Deduplicate
-    seen = set()
-    unique_items = []
-    for item in action_items:
-        task_key = item["task"].lower()[:50]
-        if task_key not in seen:
-            seen.add(task_key)
-            unique_items.append(item)
+        # Clean up the line, dropping bullet markers
+        task = line.strip().lstrip("-•* ")[:200]  # Limit length
+        if len(task) <= 10:  # Minimum task length
+            continue
+        
+        # Deduplicate on a prefix of the task
+        task_key = task.lower()[:50]
+        if task_key in seen:
+            continue
+        seen.add(task_key)
+        
+        action_items.append({
+            "task": task,
+            "owner": "Seller",
+            "due_date": default_due_date,
+            "priority": "medium"
+        })
+        if len(action_items) == 10:
+            break
     
-    return unique_items[:10]
+    return action_items
 
 
 def _generate_default_action_item(account_name: str) -> List[Dict[str, Any]]:
@@ -0,0 +1,190 @@
+"""
+Multi-transcript summarization.
+
+Urgent work runs through generate_call_summary with bounded concurrency.
+Non-urgent backfills can go through the OpenAI Batch API instead, which is
+cheaper and has separate rate limits, but may take up to 24 hours.
+"""
+import io
+import os
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+
+import orjson
+from openai import AsyncOpenAI
+from dotenv import load_dotenv
+
+from llm.llm_client import LLM_MODEL, json_schema_format
+from models.call import SummarySchema
+from .call_summary import (
+    generate_call_summary,
+    _build_combined_prompt,
+    _parse_combined_response,
+    _generate_empty_summary,
+    _generate_fallback_summary,
+)
+from .action_items_extractor import _is_conversational
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Batch configuration
+MAX_CONCURRENCY = 10
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_POLL_INTERVAL = 30  # seconds
+BATCH_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+# Lazy initialization of the OpenAI client
+_client: Optional[AsyncOpenAI] = None
+
+
+def _get_client() -> AsyncOpenAI:
+    """Get or initialize the OpenAI client (lazy loading)."""
+    global _client
+    if _client is None:
+        _client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _client
+
+
+async def summarize_many(
+    transcripts: List[Dict[str, Any]],
+    use_batch_api: bool = False,
+    max_concurrency: int = MAX_CONCURRENCY,
+    poll_interval: float = BATCH_POLL_INTERVAL
+) -> List[Dict[str, Any]]:
+    """
+    Summarize several transcripts.
+
+    Args:
+        transcripts: One dict per call with generate_call_summary kwargs
+            (transcript, account_name, industry, ...)
+        use_batch_api: Submit through the OpenAI Batch API (non-urgent paths)
+        max_concurrency: Max in-flight calls when not using the Batch API
+        poll_interval: Seconds between Batch API status checks
+
+    Returns:
+        Summaries in the same order as transcripts
+    """
+    if not transcripts:
+        return []
+
+    if use_batch_api:
+        return await _summarize_with_batch_api(transcripts, poll_interval)
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def summarize(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            return await generate_call_summary(**kwargs)
+
+    return await asyncio.gather(*(summarize(t) for t in transcripts))
+
+
+async def _summarize_with_batch_api(
+    transcripts: List[Dict[str, Any]],
+    poll_interval: float
+) -> List[Dict[str, Any]]:
+    """Run the combined summary prompt for all transcripts as one batch"""
+    # Action items need a call date for relative due dates
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+    transcripts = [{**t, "call_date": t.get("call_date") or today} for t in transcripts]
+
+    requests = []
+    for i, t in enumerate(transcripts):
+        transcript = t.get("transcript") or ""
+        if len(transcript.strip()) < 50 or not _is_conversational(transcript):
+            continue
+        requests.append(_batch_request(str(i), _build_combined_prompt(
+            transcript,
+            t.get("account_name", "Unknown"),
+            t.get("industry", "Unknown"),
+            t.get("deal_stage", "Discovery"),
+            t.get("duration_minutes", 0),
+            t.get("seller_name", "Seller"),
+            t["call_date"],
+        )))
+
+    outputs: Dict[str, str] = {}
+    if requests:
+        try:
+            outputs = await _run_batch(requests, poll_interval)
+        except Exception as e:
+            logger.error(f"Batch summarization failed: {e}", exc_info=True)
+
+    return [_collect_summary(i, t, outputs) for i, t in enumerate(transcripts)]
+
+
+def _batch_request(custom_id: str, prompt: str) -> Dict[str, Any]:
+    """Build one line of the Batch API input file"""
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": {
+            "model": LLM_MODEL,
+            "temperature": 0,
+            "response_format": json_schema_format(SummarySchema),
+            "messages": [{"role": "user", "content": prompt}],
+        },
+    }
+
+
+async def _run_batch(requests: List[Dict[str, Any]], poll_interval: float) -> Dict[str, str]:
+    """Submit requests as a batch, wait for it, and return content by custom_id"""
+    client = _get_client()
+
+    payload = b"\n".join(orjson.dumps(r) for r in requests)
+    input_file = await client.files.create(
+        file=("summaries.jsonl", io.BytesIO(payload)),
+        purpose="batch",
+    )
+    batch = await client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window=BATCH_COMPLETION_WINDOW,
+    )
+    logger.info(f"Submitted summary batch {batch.id} with {len(requests)} requests")
+
+    while batch.status not in BATCH_TERMINAL_STATUSES:
+        await asyncio.sleep(poll_interval)
+        batch = await client.batches.retrieve(batch.id)
+
+    if batch.status != "completed" or not batch.output_file_id:
+        raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+
+    output = await client.files.content(batch.output_file_id)
+
+    outputs = {}
+    for line in output.content.splitlines():
+        if not line.strip():
+            continue
+        result = orjson.loads(line)
+        response = result.get("response") or {}
+        if response.get("status_code") != 200:
+            logger.warning(f"Batch request {result.get('custom_id')} failed: {result.get('error')}")
+            continue
+        outputs[result["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+
+    logger.info(f"Batch {batch.id} completed with {len(outputs)}/{len(requests)} results")
+    return outputs
+
+
+def _collect_summary(i: int, t: Dict[str, Any], outputs: Dict[str, str]) -> Dict[str, Any]:
+    """Assemble the summary for transcript i from batch outputs, with fallbacks"""
+    transcript = t.get("transcript") or ""
+    account_name = t.get("account_name", "Unknown")
+
+    if len(transcript.strip()) < 50:
+        return _generate_empty_summary(account_name)
+    if not _is_conversational(transcript):
+        return _generate_fallback_summary(transcript, account_name)
+
+    try:
+        return _parse_combined_response(outputs[str(i)], t["call_date"], account_name)
+    except Exception as e:
+        logger.warning(f"No batch summary for transcript {i}: {e}")
+        return _generate_fallback_summary(transcript, account_name)
@@ -2,27 +2,41 @@
 Call Summary Generator for Live Call Assistant.
 Uses LLM to generate structured summaries from call transcripts.
 """
-import os
+import re
 import json
 import logging
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional
 from datetime import datetime
-from langchain_openai import ChatOpenAI
-from dotenv import load_dotenv
 
-from .prompt_templates import SUMMARY_PROMPT_TEMPLATE
-from .action_items_extractor import extract_action_items
-
-load_dotenv()
+from llm.llm_client import astream_text, truncate_to_tokens
+from models.call import SummarySchema
+from .llm_cache import cached_llm_call, get_exact, set_exact
+from .prompt_templates import COMBINED_PROMPT_TEMPLATE
+from .action_items_extractor import (
+    _is_conversational,
+    _normalize_action_items,
+    _generate_default_action_item,
+)
 
 logger = logging.getLogger(__name__)
 
-# Initialize LLM
-llm = ChatOpenAI(
-    model="gpt-4o-mini",
-    temperature=0,
-    api_key=os.getenv("OPENAI_API_KEY")
+# Top-level summary fields surfaced while streaming, in prompt order
+STREAMED_FIELDS = (
+    "executive_summary",
+    "key_points",
+    "pain_points",
+    "objections",
+    "next_steps",
+    "deal_health_score",
+    "deal_health_reason",
 )
+_FIELD_KEY_RES = {
+    name: re.compile(rf'"{name}"\s*:\s*') for name in STREAMED_FIELDS
+}
+_json_decoder = json.JSONDecoder()
+# Text before the first colon on each line, for the fallback summary
+_SPEAKER_RE = re.compile(r"^[ \t]*([^:\n]*?)[ \t]*:", re.MULTILINE)
+SUMMARY_TRANSCRIPT_TOKENS = 10000  # Transcript budget in the summary prompt
 
 
 async def generate_call_summary(
@@ -32,7 +46,8 @@ async def generate_call_summary(
     duration_minutes: int = 0,
     industry: str = "Unknown",
     deal_stage: str = "Discovery",
-    seller_name: str = "Seller"
+    seller_name: str = "Seller",
+    call_date: str = None
 ) -> Dict[str, Any]:
     """
     Generate a structured summary from a call transcript.
@@ -45,6 +60,7 @@ async def generate_call_summary(
         industry: Customer industry
         deal_stage: Current deal stage
         seller_name: Name of the seller
+        call_date: Date of the call (ISO format), defaults to today
     
     Returns:
         Dictionary containing:
@@ -61,90 +77,187 @@ async def generate_call_summary(
         logger.warning("Transcript too short for meaningful summary")
         return _generate_empty_summary(account_name)
     
-    # Build the summary prompt
-    prompt = SUMMARY_PROMPT_TEMPLATE.format(
-        account_name=account_name,
-        industry=industry,
-        deal_stage=deal_stage,
-        duration_minutes=duration_minutes,
-        transcript=transcript[:15000],  # Limit transcript length
+    if not _is_conversational(transcript):
+        logger.info("Transcript is not conversational, skipping summary LLM call")
+        return _generate_fallback_summary(transcript, account_name)
+    
+    if not call_date:
+        call_date = datetime.utcnow().strftime("%Y-%m-%d")
+    
+    # Summary and action items come from one LLM call, so the transcript
+    # is only sent once
+    prompt = _build_combined_prompt(
+        transcript, account_name, industry, deal_stage, duration_minutes,
+        seller_name, call_date
     )
     
     try:
-        # Generate summary
-        response = llm.invoke(prompt)
-        summary_text = response.content.strip()
-        
-        # Parse JSON response
-        summary = _parse_summary_response(summary_text)
-        
-        # Extract action items separately for better accuracy
-        action_items = await extract_action_items(
-            transcript=transcript,
-            account_name=account_name,
-            seller_name=seller_name,
+        response = await cached_llm_call(
+            prompt,
+            truncate_to_tokens(transcript, SUMMARY_TRANSCRIPT_TOKENS),  # As sent in the prompt
+            namespace="call_summary",
+            params={
+                "account_name": account_name,
+                "industry": industry,
+                "deal_stage": deal_stage,
+                "duration_minutes": duration_minutes,
+                "seller_name": seller_name,
+                "call_date": call_date,
+            },
+            schema=SummarySchema,
         )
-        
-        summary["action_items"] = action_items
-        
-        logger.info(f"Generated summary for {account_name} with {len(action_items)} action items")
-        return summary
+        summary = _parse_combined_response(response, call_date, account_name)
         
     except Exception as e:
         logger.error(f"Error generating summary: {e}", exc_info=True)
         return _generate_fallback_summary(transcript, account_name)
+    
+    logger.info(f"Generated summary for {account_name} with {len(summary['action_items'])} action items")
+    return summary
 
 
-def _parse_summary_response(response_text: str) -> Dict[str, Any]:
+async def stream_call_summary(
+    transcript: str,
+    account_name: str = "Unknown",
+    deal_id: int = None,
+    duration_minutes: int = 0,
+    industry: str = "Unknown",
+    deal_stage: str = "Discovery",
+    seller_name: str = "Seller",
+    call_date: str = None
+) -> AsyncIterator[Dict[str, Any]]:
     """
-    Parse LLM response into structured summary.
-    Handles JSON extraction from potentially noisy output.
+    Stream a call summary while the LLM generates it.
+    Takes the same arguments as generate_call_summary.
+    
+    Yields events:
+        - {"type": "token", "text": str} for each chunk of LLM output
+        - {"type": "field", "name": str, "value": Any} as soon as a top-level
+          summary field (see STREAMED_FIELDS) is complete in the output
+        - {"type": "final", "summary": dict} last, with the parsed summary
+          and action items (same shape as generate_call_summary)
     """
-    # Try to extract JSON from response
+    if not transcript or len(transcript.strip()) < 50:
+        logger.warning("Transcript too short for meaningful summary")
+        yield {"type": "final", "summary": _generate_empty_summary(account_name)}
+        return
+    
+    if not _is_conversational(transcript):
+        logger.info("Transcript is not conversational, skipping summary LLM call")
+        yield {"type": "final", "summary": _generate_fallback_summary(transcript, account_name)}
+        return
+    
+    if not call_date:
+        call_date = datetime.utcnow().strftime("%Y-%m-%d")
+    
+    prompt = _build_combined_prompt(
+        transcript, account_name, industry, deal_stage, duration_minutes,
+        seller_name, call_date
+    )
+    
     try:
-        # Handle markdown code blocks
-        if "```json" in response_text:
-            json_start = response_text.index("```json") + 7
-            json_end = response_text.index("```", json_start)
-            response_text = response_text[json_start:json_end].strip()
-        elif "```" in response_text:
-            json_start = response_text.index("```") + 3
-            json_end = response_text.index("```", json_start)
-            response_text = response_text[json_start:json_end].strip()
-        
-        # Find JSON object bounds
-        if "{" in response_text:
-            start = response_text.index("{")
-            # Find matching closing brace
-            depth = 0
-            end = start
-            for i, char in enumerate(response_text[start:], start):
-                if char == "{":
-                    depth += 1
-                elif char == "}":
-                    depth -= 1
-                    if depth == 0:
-                        end = i + 1
-                        break
-            response_text = response_text[start:end]
+        response_text = ""
+        pending = list(STREAMED_FIELDS)
         
-        summary = json.loads(response_text)
-        
-        # Validate and normalize structure
-        return {
-            "executive_summary": summary.get("executive_summary", ""),
-            "key_points": summary.get("key_points", []),
-            "pain_points": _normalize_pain_points(summary.get("pain_points", [])),
-            "objections": _normalize_objections(summary.get("objections", [])),
-            "next_steps": summary.get("next_steps", ""),
-            "deal_health_score": min(10, max(1, int(summary.get("deal_health_score", 5)))),
-            "deal_health_reason": summary.get("deal_health_reason", ""),
-        }
+        async for text in _stream_llm_text(prompt):
+            response_text += text
+            yield {"type": "token", "text": text}
+            
+            for name, value in _pop_completed_fields(response_text, pending):
+                yield {"type": "field", "name": name, "value": value}
         
-    except json.JSONDecodeError as e:
-        logger.warning(f"Failed to parse JSON: {e}")
-        # Try to extract key information from text
-        return _parse_text_summary(response_text)
+        summary = _parse_combined_response(response_text, call_date, account_name)
+        # Only cache output that parsed, so a truncated stream isn't replayed
+        set_exact(prompt, response_text)
+    
+    except Exception as e:
+        logger.error(f"Error streaming summary: {e}", exc_info=True)
+        summary = _generate_fallback_summary(transcript, account_name)
+    
+    yield {"type": "final", "summary": summary}
+
+
+async def _stream_llm_text(prompt: str) -> AsyncIterator[str]:
+    """Yield LLM output text chunks, replaying an exact cache hit as one chunk"""
+    cached = get_exact(prompt)
+    if cached is not None:
+        yield cached
+        return
+    
+    async for text in astream_text(prompt, schema=SummarySchema):
+        yield text
+
+
+def _pop_completed_fields(text: str, pending: List[str]) -> List[tuple]:
+    """
+    Find pending top-level fields whose JSON value is complete in the
+    partial response text. Completed names are removed from pending.
+    """
+    completed = []
+    for name in list(pending):
+        match = _FIELD_KEY_RES[name].search(text)
+        if not match:
+            continue
+        try:
+            value, end = _json_decoder.raw_decode(text, match.end())
+        except json.JSONDecodeError:
+            continue  # Value still streaming
+        if end >= len(text):
+            continue  # A trailing number may still be growing
+        pending.remove(name)
+        completed.append((name, value))
+    return completed
+
+
+def _build_combined_prompt(
+    transcript: str,
+    account_name: str,
+    industry: str,
+    deal_stage: str,
+    duration_minutes: int,
+    seller_name: str,
+    call_date: str
+) -> str:
+    """Build the combined summary and action items prompt for a transcript"""
+    return COMBINED_PROMPT_TEMPLATE.substitute(
+        account_name=account_name,
+        industry=industry,
+        deal_stage=deal_stage,
+        duration_minutes=duration_minutes,
+        seller_name=seller_name,
+        call_date=call_date,
+        transcript=truncate_to_tokens(transcript, SUMMARY_TRANSCRIPT_TOKENS),  # Limit transcript length
+    )
+
+
+def _parse_combined_response(
+    response_text: str,
+    call_date: str,
+    account_name: str
+) -> Dict[str, Any]:
+    """
+    Parse a structured output response into a summary with action items.
+    Raises pydantic.ValidationError if it doesn't match SummarySchema.
+    """
+    data = SummarySchema.model_validate_json(response_text).model_dump()
+    
+    summary = _normalize_summary(data)
+    action_items = _normalize_action_items(data.get("action_items", []), call_date)
+    summary["action_items"] = action_items[:10] or _generate_default_action_item(account_name)
+    return summary
+
+
+def _normalize_summary(summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate and normalize summary structure"""
+    return {
+        "executive_summary": summary.get("executive_summary", ""),
+        "key_points": summary.get("key_points", []),
+        "pain_points": _normalize_pain_points(summary.get("pain_points", [])),
+        "objections": _normalize_objections(summary.get("objections", [])),
+        "next_steps": summary.get("next_steps", ""),
+        "deal_health_score": min(10, max(1, int(summary.get("deal_health_score", 5)))),
+        "deal_health_reason": summary.get("deal_health_reason", ""),
+    }
 
 
 def _normalize_pain_points(pain_points: List) -> List[Dict]:
@@ -185,78 +298,6 @@ def _normalize_objections(objections: List) -> List[Dict]:
     return normalized
 
 
-def _parse_text_summary(text: str) -> Dict[str, Any]:
-    """
-    Fallback parser for non-JSON responses.
-    Extracts information from plain text.
-    """
-    lines = text.strip().split("\n")
-    
-    summary = {
-        "executive_summary": "",
-        "key_points": [],
-        "pain_points": [],
-        "objections": [],
-        "next_steps": "",
-        "deal_health_score": 5,
-        "deal_health_reason": "Unable to parse structured response",
-    }
-    
-    # Try to find key sections
-    current_section = None
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        lower_line = line.lower()
-        
-        if "executive summary" in lower_line or "summary:" in lower_line:
-            current_section = "executive_summary"
-        elif "key point" in lower_line or "discussion point" in lower_line:
-            current_section = "key_points"
-        elif "pain point" in lower_line:
-            current_section = "pain_points"
-        elif "objection" in lower_line:
-            current_section = "objections"
-        elif "next step" in lower_line:
-            current_section = "next_steps"
-        elif "health" in lower_line and "score" in lower_line:
-            current_section = "deal_health"
-        elif current_section:
-            if line.startswith("-") or line.startswith("•") or line.startswith("*"):
-                line = line[1:].strip()
-            
-            if current_section == "executive_summary":
-                summary["executive_summary"] = line
-            elif current_section == "key_points":
-                summary["key_points"].append(line)
-            elif current_section == "pain_points":
-                summary["pain_points"].append({
-                    "description": line,
-                    "severity": "medium",
-                    "context": None
-                })
-            elif current_section == "objections":
-                summary["objections"].append({
-                    "description": line,
-                    "category": "general",
-                    "response_suggested": None
-                })
-            elif current_section == "next_steps":
-                summary["next_steps"] = line
-            elif current_section == "deal_health":
-                # Try to extract score
-                import re
-                numbers = re.findall(r'\d+', line)
-                if numbers:
-                    score = int(numbers[0])
-                    summary["deal_health_score"] = min(10, max(1, score))
-                summary["deal_health_reason"] = line
-    
-    return summary
-
-
 def _generate_empty_summary(account_name: str) -> Dict[str, Any]:
     """Generate an empty summary structure"""
     return {
@@ -277,13 +318,10 @@ def _generate_fallback_summary(transcript: str, account_name: str) -> Dict[str,
     Uses simple text analysis.
     """
     # Count speakers
-    speakers = set()
-    lines = transcript.split("\n")
-    for line in lines:
-        if ":" in line:
-            speaker = line.split(":")[0].strip()
-            if speaker and len(speaker) < 30:
-                speakers.add(speaker)
+    speakers = {
+        speaker for speaker in _SPEAKER_RE.findall(transcript)
+        if speaker and len(speaker) < 30
+    }
     
     # Count words
     word_count = len(transcript.split())
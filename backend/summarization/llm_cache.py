@@ -0,0 +1,310 @@
+"""
+Response cache for summarization LLM calls.
+
+Two layers, checked in order:
+- Exact: sha256 of model + prompt, stored in Redis. Safe because the
+  summarization LLM runs at temperature=0.
+- Semantic: transcripts are embedded and matched by cosine similarity, so
+  re-running a lightly edited transcript reuses the stored LLM response.
+
+Responses are only cached once they validate against the call's schema.
+"""
+import os
+import time
+import asyncio
+import hashlib
+import functools
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Type
+
+import faiss
+import numpy as np
+import orjson
+from langchain_openai import OpenAIEmbeddings
+from pydantic import BaseModel
+from dotenv import load_dotenv
+
+from llm.llm_client import LLM_MODEL, ainvoke_text
+from storage import get_redis_client
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "llm_cache")
+EMBEDDING_MODEL = "text-embedding-3-small"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("LLM_SEMANTIC_CACHE_THRESHOLD", "0.95"))
+MAX_KEY_CHARS = 15000  # Well under the embedding model's 8k token input
+SEARCH_K = 5  # Neighbours checked for a params match
+EXACT_CACHE_TTL = 24 * 3600  # 24 hours
+SEMANTIC_CACHE_TTL = 7 * 24 * 3600  # 7 days
+SEMANTIC_CACHE_MAX_ENTRIES = 2000  # Per namespace; oldest are evicted first
+
+# Lazy initialization of embeddings client
+_embeddings: Optional[OpenAIEmbeddings] = None
+
+
+def _get_embeddings() -> OpenAIEmbeddings:
+    """Get or initialize the embeddings client (lazy loading)."""
+    global _embeddings
+    if _embeddings is None:
+        _embeddings = OpenAIEmbeddings(
+            model=EMBEDDING_MODEL,
+            api_key=os.getenv("OPENAI_API_KEY")
+        )
+    return _embeddings
+
+
+class SemanticCache:
+    """
+    Semantic cache of LLM responses keyed by transcript embedding.
+
+    Vectors are L2-normalized and stored in a faiss.IndexFlatIP, so the
+    inner product is cosine similarity. A parallel list holds the JSON
+    responses. Both are persisted under CACHE_DIR/{namespace}.*
+
+    An entry only matches if its params (account, date, ...) are equal,
+    since those are part of the prompt as well. key_text should be the
+    text the prompt actually contains; past MAX_KEY_CHARS (more than the
+    embedding takes) it has to match exactly.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        cache_dir: str = CACHE_DIR,
+        ttl: float = SEMANTIC_CACHE_TTL,
+        max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES
+    ):
+        self.namespace = namespace
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._index_path = os.path.join(cache_dir, f"{namespace}.faiss")
+        self._entries_path = os.path.join(cache_dir, f"{namespace}.json")
+        self._index: Optional[faiss.Index] = None
+        self._entries: List[Dict[str, Any]] = []
+        self._lock = asyncio.Lock()
+        # Serializes disk writes, so an older snapshot never lands last
+        self._save_lock = asyncio.Lock()
+
+    def _load(self, dim: int) -> faiss.Index:
+        """Load index and entries from disk, or create an empty index"""
+        if self._index is None:
+            if os.path.exists(self._index_path) and os.path.exists(self._entries_path):
+                try:
+                    self._index = faiss.read_index(self._index_path)
+                    with open(self._entries_path, 'rb') as f:
+                        self._entries = orjson.loads(f.read())
+                except Exception as e:
+                    logger.warning(f"Could not load LLM cache '{self.namespace}': {e}")
+                    self._index = None
+                    self._entries = []
+            if self._index is None or self._index.d != dim:
+                self._index = faiss.IndexFlatIP(dim)
+                self._entries = []
+        return self._index
+
+    def _evict(self) -> None:
+        """Drop expired entries and the oldest past max_entries"""
+        cutoff = time.time() - self.ttl
+        count = max(0, len(self._entries) - self.max_entries)
+        while count < len(self._entries) and self._entries[count].get("created_at", 0) < cutoff:
+            count += 1
+        if count:
+            # IndexFlat renumbers the remaining vectors, like the list below
+            self._index.remove_ids(np.arange(count, dtype=np.int64))
+            del self._entries[:count]
+
+    def _write(self, index_data: np.ndarray, entries_data: bytes) -> None:
+        """Write serialized index and entries to disk (runs in a thread)"""
+        os.makedirs(os.path.dirname(self._index_path), exist_ok=True)
+        faiss.write_index(faiss.deserialize_index(index_data), self._index_path)
+        with open(self._entries_path, 'wb') as f:
+            f.write(entries_data)
+
+    async def _save(self) -> None:
+        """Persist a snapshot of index and entries without blocking the event loop"""
+        async with self._save_lock:
+            async with self._lock:
+                index_data = faiss.serialize_index(self._index)
+                entries_data = orjson.dumps(self._entries)
+            await asyncio.to_thread(self._write, index_data, entries_data)
+
+    async def _embed(self, text: str) -> np.ndarray:
+        """Embed text as a normalized (1, dim) float32 vector"""
+        vector = await _get_embeddings().aembed_query(text[:MAX_KEY_CHARS])
+        vec = np.asarray([vector], dtype=np.float32)
+        faiss.normalize_L2(vec)
+        return vec
+
+    async def get_or_compute(
+        self,
+        key_text: str,
+        compute_fn: Callable[[], Awaitable[Any]],
+        params: Dict[str, Any] = None,
+        validate: Callable[[Any], Any] = None
+    ) -> Any:
+        """
+        Return the cached response for a similar key_text, or call
+        compute_fn and store its (JSON-serializable) result.
+        If validate is given, results it raises on are neither stored nor
+        served from the cache.
+        """
+        params = params or {}
+        if len(key_text) > MAX_KEY_CHARS:
+            # Only the first MAX_KEY_CHARS are embedded; the rest must match exactly
+            tail = hashlib.blake2b(key_text[MAX_KEY_CHARS:].encode("utf-8"), digest_size=16)
+            params = {**params, "_key_tail": tail.hexdigest()}
+
+        try:
+            vec = await self._embed(key_text)
+        except Exception as e:
+            logger.warning(f"LLM cache embedding failed, skipping cache: {e}")
+            return await compute_fn()
+
+        async with self._lock:
+            index = self._load(vec.shape[1])
+            if index.ntotal:
+                cutoff = time.time() - self.ttl
+                scores, ids = index.search(vec, min(SEARCH_K, index.ntotal))
+                for score, idx in zip(scores[0], ids[0]):
+                    if score < self.threshold:
+                        break
+                    entry = self._entries[idx]
+                    if (
+                        entry["params"] == params
+                        and entry.get("created_at", 0) >= cutoff
+                        and _is_valid(entry["response"], validate)
+                    ):
+                        logger.info(f"LLM cache hit ({self.namespace}, similarity={score:.3f})")
+                        return entry["response"]
+
+        result = await compute_fn()
+        if not _is_valid(result, validate):
+            logger.warning(f"Not caching invalid LLM response ({self.namespace})")
+            return result
+
+        async with self._lock:
+            index = self._load(vec.shape[1])
+            index.add(vec)
+            self._entries.append({"params": params, "response": result, "created_at": time.time()})
+            self._evict()
+        try:
+            await self._save()
+        except Exception as e:
+            logger.warning(f"Could not persist LLM cache '{self.namespace}': {e}")
+
+        return result
+
+
+def _is_valid(response: Any, validate: Optional[Callable[[Any], Any]]) -> bool:
+    """True if there's no validator or response passes it"""
+    if validate is None:
+        return True
+    try:
+        validate(response)
+        return True
+    except Exception:
+        return False
+
+
+# Cache instances, one per prompt type
+_caches: Dict[str, SemanticCache] = {}
+
+
+def get_semantic_cache(namespace: str) -> SemanticCache:
+    """Get or create the SemanticCache for a namespace"""
+    if namespace not in _caches:
+        _caches[namespace] = SemanticCache(namespace)
+    return _caches[namespace]
+
+
+async def get_or_compute(
+    key_text: str,
+    compute_fn: Callable[[], Awaitable[Any]],
+    namespace: str = "default",
+    params: Dict[str, Any] = None,
+    validate: Callable[[Any], Any] = None
+) -> Any:
+    """Look up key_text in the namespace's semantic cache, computing on miss"""
+    return await get_semantic_cache(namespace).get_or_compute(
+        key_text, compute_fn, params, validate
+    )
+
+
+# ---------------------
+# Exact-match Cache
+# ---------------------
+
+def prompt_cache_key(prompt: str, model: str = LLM_MODEL) -> str:
+    """Cache key for a deterministic (temperature=0) LLM call"""
+    return hashlib.sha256(f"{model}\n{prompt}".encode("utf-8")).hexdigest()
+
+
+def get_exact(prompt: str) -> Optional[str]:
+    """Get cached response for an exact prompt, or None (also on Redis errors)"""
+    try:
+        hit = get_redis_client().get_llm_response(prompt_cache_key(prompt))
+        if hit is not None:
+            logger.info("LLM cache hit (exact)")
+        return hit
+    except Exception as e:
+        logger.warning(f"LLM exact cache lookup failed: {e}")
+        return None
+
+
+def set_exact(prompt: str, response: str) -> None:
+    """Cache response for an exact prompt, ignoring Redis errors"""
+    try:
+        get_redis_client().set_llm_response(
+            prompt_cache_key(prompt), response, EXACT_CACHE_TTL
+        )
+    except Exception as e:
+        logger.warning(f"LLM exact cache store failed: {e}")
+
+
+def cached(fn: Callable[..., Awaitable[str]]) -> Callable[..., Awaitable[str]]:
+    """
+    Cache an async fn(prompt, ...) -> str on sha256(model + prompt).
+    Only use for temperature=0 calls. Redis errors fall through to fn.
+    With a pydantic `schema` keyword argument, only responses that
+    validate against it are cached or served.
+    """
+    @functools.wraps(fn)
+    async def wrapper(prompt: str, *args, **kwargs) -> str:
+        schema = kwargs.get("schema")
+        validate = schema.model_validate_json if schema is not None else None
+        
+        hit = get_exact(prompt)
+        if hit is not None and _is_valid(hit, validate):
+            return hit
+        
+        result = await fn(prompt, *args, **kwargs)
+        if _is_valid(result, validate):
+            set_exact(prompt, result)
+        return result
+    return wrapper
+
+
+@cached
+async def cached_llm_call(
+    prompt: str,
+    key_text: str,
+    namespace: str,
+    params: Dict[str, Any] = None,
+    schema: Type[BaseModel] = None
+) -> str:
+    """
+    Invoke the shared LLM with prompt, checking the exact cache first and
+    then the semantic cache for key_text (usually the transcript).
+    """
+    return await get_or_compute(
+        key_text,
+        lambda: ainvoke_text(prompt, schema=schema),
+        namespace=namespace,
+        params=params,
+        validate=schema.model_validate_json if schema is not None else None,
+    )
@@ -1,20 +1,62 @@
 """
 Prompt templates for call summarization and action items extraction.
+The combined and action items prompts run with structured outputs, so the
+JSON shape comes from SummarySchema / ActionItemsSchema, not the prompt.
+
+Templates use $placeholders and are filled with Template.substitute, so
+they are parsed once at import.
 """
+from string import Template
+
+ACTION_ITEMS_PROMPT_TEMPLATE = Template("""Extract action items from this sales call transcript.
+
+CALL DETAILS:
+- Customer: $account_name
+- Seller: $seller_name
+- Call Date: $call_date
+
+TRANSCRIPT:
+$transcript
+
+INSTRUCTIONS:
+1. Identify all commitments, promises, and follow-up tasks mentioned
+2. Look for phrases like:
+   - "We'll send you..."
+   - "I'll follow up with..."
+   - "Can you provide..."
+   - "Let's schedule..."
+   - "We need to..."
+   - "Action item:"
+   - "Next steps:"
 
-SUMMARY_PROMPT_TEMPLATE = """You are analyzing a sales call transcript for DXC Luxoft trade finance solutions.
+3. For each action item, determine:
+   - Task description (specific and actionable)
+   - Owner (Seller, Customer, or specific person mentioned)
+   - Due date (if mentioned, otherwise estimate based on context)
+   - Priority (high for deal blockers, medium for important, low for nice-to-have)
+
+Rules:
+- Maximum 10 action items
+- Minimum 1 action item (there's always at least a follow-up)
+- If no specific due date mentioned, use null
+- Default owner to Seller for internal tasks""")
+
+
+COMBINED_PROMPT_TEMPLATE = Template("""You are analyzing a sales call transcript for DXC Luxoft trade finance solutions.
 
 CALL DETAILS:
-- Customer: {account_name}
-- Industry: {industry}
-- Deal Stage: {deal_stage}
-- Duration: {duration_minutes} minutes
+- Customer: $account_name
+- Industry: $industry
+- Deal Stage: $deal_stage
+- Duration: $duration_minutes minutes
+- Seller: $seller_name
+- Call Date: $call_date
 
 FULL TRANSCRIPT:
-{transcript}
+$transcript
 
 INSTRUCTIONS:
-Generate a structured call summary with the following sections. Be specific and actionable.
+Generate a structured call summary and extract action items. Be specific and actionable.
 
 1. EXECUTIVE SUMMARY (2-3 sentences)
    - Overall outcome and sentiment of the call
@@ -47,85 +89,26 @@ Generate a structured call summary with the following sections. Be specific and
    - Reason for the score
    - Risk factors to watch
 
-FORMAT YOUR RESPONSE AS JSON:
-{{
-    "executive_summary": "string",
-    "key_points": ["string", "string", ...],
-    "pain_points": [
-        {{"description": "string", "severity": "low|medium|high", "context": "string"}}
-    ],
-    "objections": [
-        {{"description": "string", "category": "pricing|timeline|features|competition|general", "response_suggested": "string"}}
-    ],
-    "next_steps": "string",
-    "deal_health_score": number,
-    "deal_health_reason": "string"
-}}
-
-Return ONLY valid JSON, no additional text."""
-
-
-ACTION_ITEMS_PROMPT_TEMPLATE = """Extract action items from this sales call transcript.
-
-CALL DETAILS:
-- Customer: {account_name}
-- Seller: {seller_name}
-- Call Date: {call_date}
-
-TRANSCRIPT:
-{transcript}
-
-INSTRUCTIONS:
-1. Identify all commitments, promises, and follow-up tasks mentioned
-2. Look for phrases like:
-   - "We'll send you..."
-   - "I'll follow up with..."
-   - "Can you provide..."
-   - "Let's schedule..."
-   - "We need to..."
-   - "Action item:"
-   - "Next steps:"
-
-3. For each action item, determine:
-   - Task description (specific and actionable)
-   - Owner (Seller, Customer, or specific person mentioned)
-   - Due date (if mentioned, otherwise estimate based on context)
-   - Priority (high for deal blockers, medium for important, low for nice-to-have)
-
-FORMAT YOUR RESPONSE AS JSON:
-{{
-    "action_items": [
-        {{
-            "task": "Specific task description",
-            "owner": "Seller|Customer|Person Name",
-            "due_date": "YYYY-MM-DD or null",
-            "priority": "high|medium|low"
-        }}
-    ]
-}}
-
-Rules:
-- Maximum 10 action items
-- Minimum 1 action item (there's always at least a follow-up)
-- If no specific due date mentioned, use null
-- Default owner to Seller for internal tasks
-
-Return ONLY valid JSON, no additional text."""
+7. ACTION ITEMS (1-10 items, there's always at least a follow-up)
+   - All commitments, promises, and follow-up tasks mentioned
+   - Owner: Seller, Customer, or specific person mentioned (default Seller for internal tasks)
+   - Due date: YYYY-MM-DD if mentioned, otherwise null
+   - Priority: high for deal blockers, medium for important, low for nice-to-have""")
 
 
-LIVE_QUERY_PROMPT_TEMPLATE = """You are a real-time sales assistant helping a seller during an active call.
+LIVE_QUERY_PROMPT_TEMPLATE = Template("""You are a real-time sales assistant helping a seller during an active call.
 
 CURRENT CALL CONTEXT:
-- Customer: {account_name}
-- Industry: {industry}
+- Customer: $account_name
+- Industry: $industry
 - Recent Conversation (last 2 minutes):
-{recent_transcript}
+$recent_transcript
 
 RELEVANT KNOWLEDGE BASE CONTEXT:
-{rag_context}
+$rag_context
 
 SELLER'S QUESTION:
-{query}
+$query
 
 INSTRUCTIONS:
 1. Answer the question concisely (caller is on the line!)
@@ -134,4 +117,4 @@ INSTRUCTIONS:
 4. Keep response to 2-3 sentences maximum
 5. Use bullet points only if listing multiple items
 
-Provide a clear, immediate answer that the seller can use right now in the conversation."""
+Provide a clear, immediate answer that the seller can use right now in the conversation.""")
@@ -0,0 +1,43 @@
+"""
+Tests for the transcript fallback in the action items extractor.
+"""
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import pytest
+
+from summarization.action_items_extractor import (
+    _INDICATOR_RE,
+    _extract_action_items_from_text,
+)
+
+
+@pytest.mark.parametrize("line", [
+    "Discuss next steps with legal",
+    "We scheduled the demo for Friday",
+    "I am reviewing the contract terms",
+    "She has prepared the pricing deck",
+    "I WILL SEND the proposal tomorrow",
+])
+def test_indicator_matches_inflected_forms(line):
+    assert _INDICATOR_RE.search(line)
+
+
+def test_indicator_ignores_lines_without_indicators():
+    assert not _INDICATOR_RE.search("Thanks everyone for joining today")
+
+
+def test_fallback_extracts_inflected_lines():
+    text = (
+        "Thanks everyone for joining today\n"
+        "- We scheduled the demo for Friday\n"
+        "Discuss next steps with legal\n"
+    )
+    items = _extract_action_items_from_text(text, "2026-01-01")
+
+    assert [item["task"] for item in items] == [
+        "We scheduled the demo for Friday",
+        "Discuss next steps with legal",
+    ]
+    assert all(item["due_date"] == "2026-01-08" for item in items)
@@ -3,25 +3,166 @@ Transcription Service for Live Call Assistant.
 Supports AssemblyAI real-time transcription with mock mode fallback.
 """
 import os
-import base64
+import sys
 import logging
 import asyncio
-from typing import Callable, Dict, Any, Optional
+import io
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
 from uuid import UUID
 from datetime import datetime
 from dotenv import load_dotenv
 
+# SIMD base64 decoding when available
+try:
+    from pybase64 import b64decode
+except ImportError:
+    from base64 import b64decode
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
 # Configuration
 ASSEMBLYAI_API_KEY = os.getenv("ASSEMBLYAI_API_KEY", "")
+# Stream to AssemblyAI's real-time API instead of transcribing ~5 s batches.
+# Lower latency, but real-time transcripts have no speaker labels.
+ASSEMBLYAI_REALTIME = os.getenv("ASSEMBLYAI_REALTIME", "").lower() == "true"
+ASSEMBLYAI_SAMPLE_RATE = int(os.getenv("ASSEMBLYAI_SAMPLE_RATE", "16000"))
 AZURE_SPEECH_KEY = os.getenv("AZURE_SPEECH_KEY", "")
 AZURE_SPEECH_REGION = os.getenv("AZURE_SPEECH_REGION", "eastus")
 
 # Use mock mode if no API keys configured
 USE_MOCK_MODE = not ASSEMBLYAI_API_KEY and not AZURE_SPEECH_KEY
+# Simulated per-chunk latency in mock mode (seconds); 0 disables it
+MOCK_TRANSCRIPTION_DELAY = float(os.getenv("MOCK_TRANSCRIPTION_DELAY", "0"))
+
+# Recent transcripts per session by audio hash, so a call's repeated audio
+# (hold music, silence) skips the AssemblyAI round trip
+TRANSCRIPT_CACHE_SIZE = 32
+
+# Per-session AssemblyAI audio buffer, sized to hold a ~5 s flush (80 KB)
+# plus one more chunk, so steady-state ingest never reallocates
+_AUDIO_BUFFER_BYTES = 96_000
+
+
+# Interned so every mock chunk shares the same speaker label objects
+_CUSTOMER = sys.intern("Customer")
+_SELLER = sys.intern("Seller")
+
+
+def _build_mock_timeline(phrases, us_per_word: int = 400_000, gap_us: int = 500_000):
+    """Fold phrases into (speaker, text, start_us, end_us) entries"""
+    timeline = []
+    t = 0
+    for speaker, text in phrases:
+        duration = len(text.split()) * us_per_word  # ~150 words per minute
+        timeline.append((speaker, text, t, t + duration))
+        t += duration + gap_us  # Small gap
+    return tuple(timeline)
+
+
+# Mock transcript that simulates a 4-minute sales call between ANZ Bank and DXC Luxoft.
+# Offsets are integer microseconds from the start of the session
+_MOCK_TIMELINE = _build_mock_timeline((
+    # Opening (0:00 - 0:30)
+    (_CUSTOMER, "Good morning! Thanks for taking the time to meet with us today. I'm David Chen, Head of Trade Finance Operations at ANZ Bank."),
+    (_SELLER, "Good morning David, great to meet you. I'm Ravikiran from DXC Luxoft. We're excited to discuss how we can help modernize ANZ's trade finance operations."),
+    (_CUSTOMER, "Perfect. So tell me more about your trade finance solution and what makes DXC Luxoft different from other vendors we've spoken to."),
+    
+    # Solution Overview (0:30 - 1:15)
+    (_SELLER, "Our platform provides end-to-end trade finance automation covering Letters of Credit, Bank Guarantees, and Documentary Collections. What sets us apart is our deep banking domain expertise combined with modern technology."),
+    (_CUSTOMER, "That's interesting. What about integration with existing systems? We have legacy core banking systems that we can't easily replace."),
+    (_SELLER, "We support APIs for all major banking systems including Temenos, Finastra, and core SWIFT integration. Our modular architecture allows us to integrate without disrupting your existing infrastructure."),
+    (_CUSTOMER, "How long does implementation typically take? We've had bad experiences with vendors promising quick delivery but taking years."),
+    (_SELLER, "Usually 12 to 18 months depending on complexity. For a bank your size with multiple product lines, I'd estimate 14-16 months for full implementation."),
+    
+    # Reference Cases (1:15 - 2:00)
+    (_CUSTOMER, "What was the team size for your last major project? And can you share some specific outcomes?"),
+    (_SELLER, "For CBA we had a 45-person team over 18 months. We achieved 30% reduction in processing times and 40% fewer manual errors. They now process over 50,000 transactions monthly."),
+    (_CUSTOMER, "That's impressive. What about other Australian banks? Have you worked with any of our competitors?"),
+    (_SELLER, "Yes, we've also worked with SMBC on LC automation where we integrated 3 core systems including SWIFT. They saw a 25% increase in straight-through processing rates."),
+    (_CUSTOMER, "That sounds reasonable. What about data privacy and regulatory compliance? This is a critical concern for us."),
+    
+    # Data Privacy & Compliance (2:00 - 2:45)
+    (_SELLER, "We follow strict regional data compliance requirements. For SCB in Singapore, we implemented data residency controls to meet MAS guidelines. All data stays within the specified jurisdiction."),
+    (_CUSTOMER, "How do you handle regional data sovereignty? We have operations across APAC and need to ensure compliance in each market."),
+    (_SELLER, "Our platform supports multi-region deployment with data isolation. Each region can have its own data store while sharing business logic. We're certified for SOC 2 Type II and ISO 27001."),
+    (_CUSTOMER, "What about AI capabilities? We've been exploring how AI can help with document processing and fraud detection."),
+    
+    # AI Capabilities (2:45 - 3:30)
+    (_SELLER, "Great question. We have AI-powered document classification that achieved 92% accuracy in our POC with CBA. It handles trade documents like Bills of Lading, Invoices, and Certificates of Origin."),
+    (_CUSTOMER, "Is this AI actually in production or still experimental?"),
+    (_SELLER, "It's in production at two client sites. We use Azure OpenAI for document understanding and have built custom models for trade finance specific terminology and compliance checking."),
+    (_CUSTOMER, "What about pricing? Can you give me a ballpark figure for a project of our scale?"),
+    
+    # Commercial Discussion (3:30 - 4:00)
+    (_SELLER, "For a full implementation with your requirements, we're typically looking at 4 to 5 million dollars over the implementation period. This includes licensing, implementation services, and first year support."),
+    (_CUSTOMER, "That's within our budget range. What would you need from us to put together a formal proposal?"),
+    (_SELLER, "I'd need details on your current transaction volumes, the specific products you want to automate first, and your integration landscape. Could we schedule a technical deep-dive session next week?"),
+    (_CUSTOMER, "Yes, let's do that. I'll have my team prepare the technical requirements document. Can you send over some case studies and your security documentation in the meantime?"),
+    (_SELLER, "Absolutely. I'll send those over today along with a high-level solution architecture. Thank you for your time today, David. I'm confident we can help ANZ achieve significant operational improvements."),
+    (_CUSTOMER, "Thank you Ravikiran. Looking forward to the next steps. Have a great day."),
+))
+
+
+def _decode_chunks(chunks: List[str]) -> bytes:
+    """
+    Decode a batch of base64 chunks with as few b64decode calls as possible.
+    Chunks are joined and decoded together; a padded chunk ends its run,
+    since decoding stops at the first padding.
+    """
+    decoded = []
+    run = []
+    for chunk in chunks:
+        run.append(chunk)
+        if chunk.endswith("="):
+            decoded.append(b64decode("".join(run)))
+            run = []
+    if run:
+        decoded.append(b64decode("".join(run)))
+    return b"".join(decoded)
+
+
+def _fingerprint(audio: memoryview) -> bytes:
+    """Hash of the whole audio buffer"""
+    return hashlib.blake2b(audio, digest_size=16).digest()
+
+
+class Session:
+    """Per-call transcription state"""
+    __slots__ = (
+        "seq", "time_us", "audio", "byte_count", "started_at",
+        "queue", "consumer", "callback", "realtime", "transcripts",
+    )
+    
+    def __init__(self):
+        self.seq = 0  # Next mock phrase
+        self.time_us = 0  # Transcript time, integer microseconds (exact, no drift)
+        self.audio: Optional[bytearray] = None  # AssemblyAI audio buffer, reused across flushes
+        self.byte_count = 0  # Bytes of pending audio at the front of the buffer
+        self.started_at = datetime.utcnow()
+        self.queue: asyncio.Queue = asyncio.Queue()  # Base64 audio awaiting decode
+        self.consumer: Optional[asyncio.Task] = None
+        self.callback: Optional[Callable] = None
+        self.realtime = None  # AssemblyAI RealtimeTranscriber, in real-time mode
+        # audio hash -> ((speaker, text, start_ms, end_ms), ...)
+        self.transcripts: "OrderedDict[bytes, Tuple[tuple, ...]]" = OrderedDict()
+    
+    async def close(self) -> None:
+        """Stop the audio consumer and drop any buffered audio"""
+        if self.consumer is not None:
+            self.consumer.cancel()
+            self.consumer = None
+        realtime, self.realtime = self.realtime, None
+        self.audio = None
+        self.byte_count = 0
+        self.transcripts.clear()
+        if realtime is not None:
+            # close() blocks until the stream is torn down
+            await asyncio.to_thread(realtime.close)
 
 
 class TranscriptionService:
@@ -29,8 +170,8 @@ class TranscriptionService:
     Transcription service that handles real-time speech-to-text.
     
     Features:
-    - AssemblyAI real-time streaming (primary)
-    - Azure Speech Services (fallback)
+    - AssemblyAI transcription (primary), batched or real-time streaming
+    - Azure Speech Services (pending; runs mock mode until implemented)
     - Mock mode for development/testing
     - Speaker diarization support
     - Callback-based chunk delivery
@@ -38,16 +179,22 @@ class TranscriptionService:
     
     def __init__(self, use_mock: bool = USE_MOCK_MODE):
         self.use_mock = use_mock
-        self._active_sessions: Dict[str, Any] = {}
-        self._sequence_trackers: Dict[str, int] = {}
-        self._time_trackers: Dict[str, float] = {}
+        self._sessions: Dict[UUID, Session] = {}
         
+        # Pick the backend once; process_audio_chunk just calls it
         if self.use_mock:
             logger.info("Transcription service running in MOCK mode")
+            self._dispatch = self._process_mock
+        elif ASSEMBLYAI_API_KEY and ASSEMBLYAI_REALTIME:
+            logger.info("Transcription service using AssemblyAI real-time streaming")
+            self._dispatch = self._process_assemblyai_realtime
         elif ASSEMBLYAI_API_KEY:
             logger.info("Transcription service using AssemblyAI")
+            self._dispatch = self._process_assemblyai
         else:
-            logger.info("Transcription service using Azure Speech")
+            # Azure Speech streaming isn't implemented yet
+            logger.warning("Azure Speech not implemented yet, transcription running in MOCK mode")
+            self._dispatch = self._process_mock
     
     async def process_audio_chunk(
         self,
@@ -66,287 +213,247 @@ class TranscriptionService:
             callback: Async function to call with transcript chunks
                       signature: (call_id, speaker, text, start_time, end_time, is_final)
         """
-        call_id_str = str(call_id)
-        
         # Initialize tracking for new calls
-        if call_id_str not in self._time_trackers:
-            self._time_trackers[call_id_str] = 0.0
-            self._sequence_trackers[call_id_str] = 0
+        session = self._sessions.get(call_id)
+        if session is None:
+            session = self._sessions[call_id] = Session()
         
-        if self.use_mock:
-            await self._process_mock(call_id, callback)
-        elif ASSEMBLYAI_API_KEY:
-            await self._process_assemblyai(call_id, audio_data, sequence, callback)
-        else:
-            await self._process_azure(call_id, audio_data, sequence, callback)
+        await self._dispatch(call_id, session, audio_data, callback)
     
     async def _process_mock(
         self,
         call_id: UUID,
+        session: Session,
+        audio_data: str,
         callback: Callable
     ) -> None:
         """
         Mock transcription for development.
         Generates realistic-looking transcript chunks.
         """
-        call_id_str = str(call_id)
-        
         # Simulate some processing delay
-        await asyncio.sleep(0.1)
-        
-        # Get current time
-        current_time = self._time_trackers.get(call_id_str, 0.0)
-        
-        # Mock transcripts that simulate a 4-minute sales call between ANZ Bank and DXC Luxoft
-        mock_phrases = [
-            # Opening (0:00 - 0:30)
-            ("Customer", "Good morning! Thanks for taking the time to meet with us today. I'm David Chen, Head of Trade Finance Operations at ANZ Bank."),
-            ("Seller", "Good morning David, great to meet you. I'm Ravikiran from DXC Luxoft. We're excited to discuss how we can help modernize ANZ's trade finance operations."),
-            ("Customer", "Perfect. So tell me more about your trade finance solution and what makes DXC Luxoft different from other vendors we've spoken to."),
-            
-            # Solution Overview (0:30 - 1:15)
-            ("Seller", "Our platform provides end-to-end trade finance automation covering Letters of Credit, Bank Guarantees, and Documentary Collections. What sets us apart is our deep banking domain expertise combined with modern technology."),
-            ("Customer", "That's interesting. What about integration with existing systems? We have legacy core banking systems that we can't easily replace."),
-            ("Seller", "We support APIs for all major banking systems including Temenos, Finastra, and core SWIFT integration. Our modular architecture allows us to integrate without disrupting your existing infrastructure."),
-            ("Customer", "How long does implementation typically take? We've had bad experiences with vendors promising quick delivery but taking years."),
-            ("Seller", "Usually 12 to 18 months depending on complexity. For a bank your size with multiple product lines, I'd estimate 14-16 months for full implementation."),
-            
-            # Reference Cases (1:15 - 2:00)
-            ("Customer", "What was the team size for your last major project? And can you share some specific outcomes?"),
-            ("Seller", "For CBA we had a 45-person team over 18 months. We achieved 30% reduction in processing times and 40% fewer manual errors. They now process over 50,000 transactions monthly."),
-            ("Customer", "That's impressive. What about other Australian banks? Have you worked with any of our competitors?"),
-            ("Seller", "Yes, we've also worked with SMBC on LC automation where we integrated 3 core systems including SWIFT. They saw a 25% increase in straight-through processing rates."),
-            ("Customer", "That sounds reasonable. What about data privacy and regulatory compliance? This is a critical concern for us."),
-            
-            # Data Privacy & Compliance (2:00 - 2:45)
-            ("Seller", "We follow strict regional data compliance requirements. For SCB in Singapore, we implemented data residency controls to meet MAS guidelines. All data stays within the specified jurisdiction."),
-            ("Customer", "How do you handle regional data sovereignty? We have operations across APAC and need to ensure compliance in each market."),
-            ("Seller", "Our platform supports multi-region deployment with data isolation. Each region can have its own data store while sharing business logic. We're certified for SOC 2 Type II and ISO 27001."),
-            ("Customer", "What about AI capabilities? We've been exploring how AI can help with document processing and fraud detection."),
-            
-            # AI Capabilities (2:45 - 3:30)
-            ("Seller", "Great question. We have AI-powered document classification that achieved 92% accuracy in our POC with CBA. It handles trade documents like Bills of Lading, Invoices, and Certificates of Origin."),
-            ("Customer", "Is this AI actually in production or still experimental?"),
-            ("Seller", "It's in production at two client sites. We use Azure OpenAI for document understanding and have built custom models for trade finance specific terminology and compliance checking."),
-            ("Customer", "What about pricing? Can you give me a ballpark figure for a project of our scale?"),
-            
-            # Commercial Discussion (3:30 - 4:00)
-            ("Seller", "For a full implementation with your requirements, we're typically looking at 4 to 5 million dollars over the implementation period. This includes licensing, implementation services, and first year support."),
-            ("Customer", "That's within our budget range. What would you need from us to put together a formal proposal?"),
-            ("Seller", "I'd need details on your current transaction volumes, the specific products you want to automate first, and your integration landscape. Could we schedule a technical deep-dive session next week?"),
-            ("Customer", "Yes, let's do that. I'll have my team prepare the technical requirements document. Can you send over some case studies and your security documentation in the meantime?"),
-            ("Seller", "Absolutely. I'll send those over today along with a high-level solution architecture. Thank you for your time today, David. I'm confident we can help ANZ achieve significant operational improvements."),
-            ("Customer", "Thank you Ravikiran. Looking forward to the next steps. Have a great day."),
-        ]
+        if MOCK_TRANSCRIPTION_DELAY:
+            await asyncio.sleep(MOCK_TRANSCRIPTION_DELAY)
         
         # Pick a phrase based on sequence
-        seq = self._sequence_trackers.get(call_id_str, 0)
-        if seq < len(mock_phrases):
-            speaker, text = mock_phrases[seq]
-            
-            # Calculate timing
-            duration = len(text.split()) / 2.5  # ~150 words per minute
-            start_time = current_time
-            end_time = current_time + duration
+        seq = session.seq
+        if seq < len(_MOCK_TIMELINE):
+            speaker, text, start_offset_us, end_offset_us = _MOCK_TIMELINE[seq]
             
-            # Update trackers
-            self._time_trackers[call_id_str] = end_time + 0.5  # Small gap
-            self._sequence_trackers[call_id_str] = seq + 1
+            # Timings are precomputed; the session time is the base
+            base_us = session.time_us
+            session.seq = seq + 1
             
-            # Call back with transcript
+            # Call back with transcript (seconds at the callback boundary)
             await callback(
                 call_id=call_id,
                 speaker=speaker,
                 text=text,
-                start_time=start_time,
-                end_time=end_time,
+                start_time=(base_us + start_offset_us) / 1e6,
+                end_time=(base_us + end_offset_us) / 1e6,
                 is_final=True
             )
     
     async def _process_assemblyai(
         self,
         call_id: UUID,
+        session: Session,
         audio_data: str,
-        sequence: int,
         callback: Callable
     ) -> None:
         """
-        Process audio using AssemblyAI real-time transcription.
+        Process audio using AssemblyAI batch transcription of ~5 s buffers.
+        See _process_assemblyai_realtime for the streaming alternative.
         
-        Note: Full implementation requires AssemblyAI WebSocket connection.
-        This is a simplified version that uses the batch API.
+        Chunks are queued for the session's consumer task, which decodes and
+        buffers whatever has piled up in one go, so this returns immediately.
         """
         try:
             import assemblyai as aai
-            
-            aai.settings.api_key = ASSEMBLYAI_API_KEY
-            
-            # Decode audio
-            audio_bytes = base64.b64decode(audio_data)
-            
-            # For real-time, you would use aai.RealtimeTranscriber
-            # This simplified version uses the batch API
-            # In production, maintain a WebSocket connection per call
-            
-            # Store audio chunks and process in batches
-            # This is a placeholder - real implementation needs streaming
-            
-            call_id_str = str(call_id)
-            if call_id_str not in self._active_sessions:
-                self._active_sessions[call_id_str] = {
-                    "audio_buffer": bytearray(),
-                    "last_process_time": datetime.utcnow(),
-                }
-            
-            # Add to buffer
-            self._active_sessions[call_id_str]["audio_buffer"].extend(audio_bytes)
-            
-            # Process every 5 seconds of audio (approximate)
-            buffer_size = len(self._active_sessions[call_id_str]["audio_buffer"])
-            if buffer_size > 80000:  # ~5 seconds at 16kHz
-                await self._transcribe_buffer_assemblyai(call_id, callback)
-            
         except ImportError:
             logger.warning("AssemblyAI SDK not installed, falling back to mock")
-            await self._process_mock(call_id, callback)
-        except Exception as e:
-            logger.error(f"AssemblyAI error: {e}")
-            raise
+            await self._process_mock(call_id, session, audio_data, callback)
+            return
+        
+        aai.settings.api_key = ASSEMBLYAI_API_KEY
+        
+        session.callback = callback
+        if session.consumer is None:
+            session.consumer = asyncio.create_task(self._consume_assemblyai(call_id, session))
+        session.queue.put_nowait(audio_data)
+    
+    async def _consume_assemblyai(self, call_id: UUID, session: Session) -> None:
+        """Drain a session's audio queue, batching chunks that arrive together"""
+        queue = session.queue
+        while True:
+            chunks = [await queue.get()]
+            while not queue.empty():
+                chunks.append(queue.get_nowait())
+            
+            try:
+                # Copy decoded audio into the session buffer
+                audio_bytes = _decode_chunks(chunks)
+                buf = session.audio
+                if buf is None:
+                    buf = session.audio = bytearray(_AUDIO_BUFFER_BYTES)
+                start = session.byte_count
+                end = start + len(audio_bytes)
+                if end > len(buf):
+                    # Rare: a backlog of chunks overflowed the buffer, grow 1.5x
+                    buf.extend(bytes(max(end, len(buf) * 3 // 2) - len(buf)))
+                buf[start:end] = audio_bytes
+                session.byte_count = end
+                
+                # Process every 5 seconds of audio (approximate)
+                if session.byte_count > 80000:  # ~5 seconds at 16kHz
+                    await self._transcribe_buffer_assemblyai(call_id, session, session.callback)
+            
+            except Exception as e:
+                logger.error("AssemblyAI error for call %s: %s", call_id, e)
     
     async def _transcribe_buffer_assemblyai(
         self,
         call_id: UUID,
+        session: Session,
         callback: Callable
     ) -> None:
         """Transcribe buffered audio using AssemblyAI"""
         import assemblyai as aai
-        import tempfile
         
-        call_id_str = str(call_id)
-        session = self._active_sessions.get(call_id_str)
-        
-        if not session or not session["audio_buffer"]:
+        if not session.byte_count:
             return
         
-        # Write buffer to temp file
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-            f.write(bytes(session["audio_buffer"]))
-            temp_path = f.name
+        # Take the pending audio; the buffer is rewound and refilled from the start.
+        # The SDK gets its own copy, so the buffer is free for reuse right away.
+        cache = session.transcripts
+        with memoryview(session.audio)[:session.byte_count] as view:
+            key = _fingerprint(view)
+            utterances = cache.get(key)
+            audio = io.BytesIO(view) if utterances is None else None
+        session.byte_count = 0
         
-        try:
+        if utterances is not None:
+            cache.move_to_end(key)
+        else:
             # Transcribe
             transcriber = aai.Transcriber()
             config = aai.TranscriptionConfig(
                 speaker_labels=True,
             )
-            transcript = transcriber.transcribe(temp_path, config)
+            # transcribe() uploads and polls synchronously; keep it off the event loop
+            transcript = await asyncio.to_thread(transcriber.transcribe, audio, config)
             
-            if transcript.status == aai.TranscriptStatus.completed:
-                current_time = self._time_trackers.get(call_id_str, 0.0)
-                
-                # Process utterances
-                for utterance in transcript.utterances or []:
-                    speaker = f"Speaker {utterance.speaker}"
-                    text = utterance.text
-                    start_time = current_time + (utterance.start / 1000)
-                    end_time = current_time + (utterance.end / 1000)
-                    
-                    await callback(
-                        call_id=call_id,
-                        speaker=speaker,
-                        text=text,
-                        start_time=start_time,
-                        end_time=end_time,
-                        is_final=True
-                    )
-                
-                # Update time tracker
-                if transcript.utterances:
-                    last_utterance = transcript.utterances[-1]
-                    self._time_trackers[call_id_str] = current_time + (last_utterance.end / 1000)
-            
-            # Clear buffer
-            session["audio_buffer"] = bytearray()
+            if transcript.status != aai.TranscriptStatus.completed:
+                return
             
-        finally:
-            # Clean up temp file
-            import os
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
+            utterances = tuple(
+                (f"Speaker {u.speaker}", u.text, u.start, u.end)
+                for u in transcript.utterances or []
+            )
+            cache[key] = utterances
+            if len(cache) > TRANSCRIPT_CACHE_SIZE:
+                cache.popitem(last=False)
+        
+        current_us = session.time_us
+        
+        # Process utterances (AssemblyAI times are in milliseconds)
+        for speaker, text, start_ms, end_ms in utterances:
+            await callback(
+                call_id=call_id,
+                speaker=speaker,
+                text=text,
+                start_time=(current_us + start_ms * 1000) / 1e6,
+                end_time=(current_us + end_ms * 1000) / 1e6,
+                is_final=True
+            )
+        
+        # Update time tracker
+        if utterances:
+            session.time_us = current_us + utterances[-1][3] * 1000
     
-    async def _process_azure(
+    async def _process_assemblyai_realtime(
         self,
         call_id: UUID,
+        session: Session,
         audio_data: str,
-        sequence: int,
         callback: Callable
     ) -> None:
         """
-        Process audio using Azure Speech Services.
-        
-        Note: Full implementation requires Azure Speech SDK.
-        This is a simplified placeholder.
+        Process audio using AssemblyAI real-time streaming.
+        Each session keeps one WebSocket open; stream() only queues the audio
+        and final transcripts come back through _open_realtime's handler.
         """
         try:
-            import azure.cognitiveservices.speech as speechsdk
-            
-            # Decode audio
-            audio_bytes = base64.b64decode(audio_data)
-            
-            # Configure Azure Speech
-            speech_config = speechsdk.SpeechConfig(
-                subscription=AZURE_SPEECH_KEY,
-                region=AZURE_SPEECH_REGION
-            )
-            
-            # This is a simplified version
-            # Full implementation would use continuous recognition
-            # with push audio stream
-            
-            # For now, fall back to mock
-            logger.warning("Azure Speech full implementation pending, using mock")
-            await self._process_mock(call_id, callback)
-            
+            import assemblyai as aai
         except ImportError:
-            logger.warning("Azure Speech SDK not installed, falling back to mock")
-            await self._process_mock(call_id, callback)
-        except Exception as e:
-            logger.error(f"Azure Speech error: {e}")
-            raise
+            logger.warning("AssemblyAI SDK not installed, falling back to mock")
+            await self._process_mock(call_id, session, audio_data, callback)
+            return
+        
+        if session.realtime is None:
+            aai.settings.api_key = ASSEMBLYAI_API_KEY
+            session.realtime = await self._open_realtime(aai, call_id, session, callback)
+        
+        session.realtime.stream(b64decode(audio_data))
     
-    def start_session(self, call_id: UUID) -> None:
+    async def _open_realtime(self, aai, call_id: UUID, session: Session, callback: Callable):
+        """Connect a RealtimeTranscriber that forwards final transcripts to callback"""
+        loop = asyncio.get_running_loop()
+        # Stream times are relative to the connection, which may open mid-call
+        base_us = session.time_us
+        
+        def on_data(transcript) -> None:
+            # Runs on the SDK's thread; hand the callback to the event loop
+            if not isinstance(transcript, aai.RealtimeFinalTranscript) or not transcript.text:
+                return
+            end_us = base_us + transcript.audio_end * 1000
+            session.time_us = end_us
+            asyncio.run_coroutine_threadsafe(
+                callback(
+                    call_id=call_id,
+                    speaker="Speaker",  # No diarization in real-time mode
+                    text=transcript.text,
+                    start_time=(base_us + transcript.audio_start * 1000) / 1e6,
+                    end_time=end_us / 1e6,
+                    is_final=True
+                ),
+                loop
+            )
+        
+        def on_error(error) -> None:
+            logger.error("AssemblyAI real-time error for call %s: %s", call_id, error)
+        
+        realtime = aai.RealtimeTranscriber(
+            sample_rate=ASSEMBLYAI_SAMPLE_RATE,
+            on_data=on_data,
+            on_error=on_error,
+        )
+        # connect() blocks on the WebSocket handshake
+        await asyncio.to_thread(realtime.connect)
+        logger.info("Opened AssemblyAI real-time stream for call %s", call_id)
+        return realtime
+    
+    async def start_session(self, call_id: UUID) -> None:
         """Start a transcription session for a call"""
-        call_id_str = str(call_id)
-        self._active_sessions[call_id_str] = {
-            "started_at": datetime.utcnow(),
-            "audio_buffer": bytearray(),
-        }
-        self._time_trackers[call_id_str] = 0.0
-        self._sequence_trackers[call_id_str] = 0
-        logger.info(f"Started transcription session for call {call_id}")
+        old_session = self._sessions.get(call_id)
+        self._sessions[call_id] = Session()
+        if old_session:
+            await old_session.close()
+        logger.info("Started transcription session for call %s", call_id)
     
-    def end_session(self, call_id: UUID) -> None:
+    async def end_session(self, call_id: UUID) -> None:
         """End a transcription session for a call"""
-        call_id_str = str(call_id)
-        self._active_sessions.pop(call_id_str, None)
-        self._time_trackers.pop(call_id_str, None)
-        self._sequence_trackers.pop(call_id_str, None)
-        logger.info(f"Ended transcription session for call {call_id}")
+        session = self._sessions.pop(call_id, None)
+        if session:
+            await session.close()
+        logger.info("Ended transcription session for call %s", call_id)
     
     def is_session_active(self, call_id: UUID) -> bool:
         """Check if a session is active"""
-        return str(call_id) in self._active_sessions
-
-
-# Singleton instance
-_transcription_service: Optional[TranscriptionService] = None
+        return call_id in self._sessions
 
 
+@lru_cache(maxsize=1)
 def get_transcription_service() -> TranscriptionService:
     """Get or create TranscriptionService singleton"""
-    global _transcription_service
-    if _transcription_service is None:
-        _transcription_service = TranscriptionService()
-    return _transcription_service
+    return TranscriptionService()
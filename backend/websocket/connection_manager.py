@@ -2,15 +2,41 @@
 WebSocket Connection Manager for Live Call Assistant.
 Manages WebSocket connections per call, handles message routing.
 """
-import json
+import time
+import asyncio
 import logging
-from typing import Dict, List, Optional, Set
+from functools import lru_cache
+from typing import Any, Dict, List, Set, Tuple
 from uuid import UUID
+import orjson
 from fastapi import WebSocket, WebSocketDisconnect
-from datetime import datetime
+from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
+# Outbound messages buffered per connection; a client that falls this far
+# behind is treated as dead
+OUTBOUND_QUEUE_SIZE = 256
+CLOSE_DRAIN_TIMEOUT = 2.0  # seconds to flush queued messages before closing
+
+# Messages carry naive UTC datetimes; orjson formats them in C, with a Z suffix
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+# utcnow_iso() strings are reused for this long (seconds) instead of
+# formatting a new one for every call
+TIMESTAMP_RESOLUTION = 0.01
+_timestamp_cache = [0.0, ""]  # [epoch seconds, ISO string]
+
+
+def utcnow_iso() -> str:
+    """Current UTC time in ISO format, at TIMESTAMP_RESOLUTION granularity."""
+    now = time.time()
+    if now - _timestamp_cache[0] >= TIMESTAMP_RESOLUTION:
+        _timestamp_cache[0] = now
+        # Kept naive (no UTC offset) so the stored format is unchanged
+        _timestamp_cache[1] = datetime.fromtimestamp(now, timezone.utc).replace(tzinfo=None).isoformat()
+    return _timestamp_cache[1]
+
 
 class ConnectionManager:
     """
@@ -25,11 +51,12 @@ class ConnectionManager:
     
     def __init__(self):
         # Map of call_id -> WebSocket connections
-        self._active_connections: Dict[str, List[WebSocket]] = {}
+        self._active_connections: Dict[UUID, Set[WebSocket]] = {}
         # Map of call_id -> connection metadata
-        self._connection_metadata: Dict[str, Dict] = {}
-        # Set of all connected WebSockets
-        self._all_connections: Set[WebSocket] = set()
+        self._connection_metadata: Dict[UUID, Dict] = {}
+        # Map of WebSocket -> (outbound queue, writer task), for every
+        # connected WebSocket
+        self._outboxes: Dict[WebSocket, Tuple[asyncio.Queue, asyncio.Task]] = {}
     
     async def connect(
         self,
@@ -47,14 +74,17 @@ class ConnectionManager:
         """
         await websocket.accept()
         
-        call_id_str = str(call_id)
+        connections = self._active_connections.setdefault(call_id, set())
+        if not connections:
+            # First connection for this call
+            self._connection_metadata[call_id] = metadata or {}
+        connections.add(websocket)
         
-        if call_id_str not in self._active_connections:
-            self._active_connections[call_id_str] = []
-            self._connection_metadata[call_id_str] = metadata or {}
-        
-        self._active_connections[call_id_str].append(websocket)
-        self._all_connections.add(websocket)
+        # Broadcasts are queued and sent by a writer task per connection,
+        # so producers never wait on a slow client
+        queue = asyncio.Queue(maxsize=OUTBOUND_QUEUE_SIZE)
+        task = asyncio.create_task(self._writer(websocket, call_id, queue))
+        self._outboxes[websocket] = (queue, task)
         
         logger.info(f"WebSocket connected for call {call_id}")
     
@@ -66,20 +96,38 @@ class ConnectionManager:
             websocket: The WebSocket connection to remove
             call_id: UUID of the call
         """
-        call_id_str = str(call_id)
-        
-        if call_id_str in self._active_connections:
-            if websocket in self._active_connections[call_id_str]:
-                self._active_connections[call_id_str].remove(websocket)
+        if call_id in self._active_connections:
+            self._active_connections[call_id].discard(websocket)
             
             # Cleanup if no more connections for this call
-            if not self._active_connections[call_id_str]:
-                del self._active_connections[call_id_str]
-                self._connection_metadata.pop(call_id_str, None)
+            if not self._active_connections[call_id]:
+                del self._active_connections[call_id]
+                self._connection_metadata.pop(call_id, None)
+        
+        outbox = self._outboxes.pop(websocket, None)
+        if outbox is not None:
+            outbox[1].cancel()
         
-        self._all_connections.discard(websocket)
         logger.info(f"WebSocket disconnected from call {call_id}")
     
+    async def _writer(
+        self,
+        websocket: WebSocket,
+        call_id: UUID,
+        queue: asyncio.Queue
+    ) -> None:
+        """Send queued payloads to one connection, in order."""
+        while True:
+            payload = await queue.get()
+            try:
+                await websocket.send_text(payload)
+            except Exception as e:
+                logger.error(f"Error broadcasting to connection: {e}")
+                self.disconnect(websocket, call_id)
+                return
+            finally:
+                queue.task_done()
+    
     async def send_personal_message(
         self,
         message: Dict,
@@ -87,7 +135,7 @@ class ConnectionManager:
     ) -> None:
         """Send a message to a specific WebSocket connection."""
         try:
-            await websocket.send_json(message)
+            await websocket.send_text(orjson.dumps(message, option=ORJSON_OPTIONS).decode())
         except Exception as e:
             logger.error(f"Error sending message: {e}")
     
@@ -103,28 +151,35 @@ class ConnectionManager:
             message: The message to send (will be JSON serialized)
             call_id: UUID of the call
         """
-        call_id_str = str(call_id)
-        
-        if call_id_str not in self._active_connections:
+        connections = self._active_connections.get(call_id)
+        if not connections:
             logger.warning(f"No connections found for call {call_id}")
             return
         
-        # Add timestamp if not present
+        # Add timestamp if not present (the send_* helpers build it in, so
+        # their messages don't grow after construction)
         if "timestamp" not in message:
-            message["timestamp"] = datetime.utcnow().isoformat()
+            message["timestamp"] = datetime.utcnow()
+        
+        # Serialize once for every connection (text frames; the client parses JSON).
+        # orjson writes UUID (call_id, summary_id) and datetime values natively.
+        payload = orjson.dumps(message, option=ORJSON_OPTIONS).decode()
         
-        # Send to all connections
-        disconnected = []
-        for connection in self._active_connections[call_id_str]:
+        # Hand off to each connection's writer. Snapshot first; disconnects
+        # mutate the set.
+        outboxes = self._outboxes
+        for connection in list(connections):
+            outbox = outboxes.get(connection)
+            if outbox is None:
+                continue
             try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to connection: {e}")
-                disconnected.append(connection)
+                outbox[0].put_nowait(payload)
+            except asyncio.QueueFull:
+                logger.error(f"Outbound queue full for call {call_id}, dropping slow connection")
+                self.disconnect(connection, call_id)
         
-        # Clean up disconnected connections
-        for conn in disconnected:
-            self.disconnect(conn, call_id)
+        # Give writers a turn, so a burst of broadcasts doesn't fill healthy queues
+        await asyncio.sleep(0)
     
     async def send_transcript_chunk(
         self,
@@ -138,12 +193,27 @@ class ConnectionManager:
         """Send a transcript chunk to all call connections."""
         message = {
             "type": "transcript_chunk",
-            "call_id": str(call_id),
+            "call_id": call_id,
             "speaker": speaker,
             "text": text,
             "start_time": start_time,
             "end_time": end_time,
             "is_final": is_final,
+            "timestamp": datetime.utcnow(),
+        }
+        await self.broadcast_to_call(message, call_id)
+    
+    async def send_transcript_batch(
+        self,
+        call_id: UUID,
+        chunks: List[Dict[str, Any]]
+    ) -> None:
+        """Send several partial transcript chunks in one message."""
+        message = {
+            "type": "transcript_batch",
+            "call_id": call_id,
+            "chunks": chunks,
+            "timestamp": datetime.utcnow(),
         }
         await self.broadcast_to_call(message, call_id)
     
@@ -157,10 +227,11 @@ class ConnectionManager:
         """Send a RAG query response to all call connections."""
         message = {
             "type": "query_response",
-            "call_id": str(call_id),
+            "call_id": call_id,
             "answer": answer,
             "sources": sources or [],
             "confidence": confidence,
+            "timestamp": datetime.utcnow(),
         }
         await self.broadcast_to_call(message, call_id)
     
@@ -173,9 +244,26 @@ class ConnectionManager:
         """Send a status update to all call connections."""
         message = {
             "type": "status_update",
-            "call_id": str(call_id),
+            "call_id": call_id,
             "status": status,
             "message": message_text,
+            "timestamp": datetime.utcnow(),
+        }
+        await self.broadcast_to_call(message, call_id)
+    
+    async def send_summary_partial(
+        self,
+        call_id: UUID,
+        field: str,
+        value: Any
+    ) -> None:
+        """Send one completed summary field while the summary is streaming."""
+        message = {
+            "type": "summary_partial",
+            "call_id": call_id,
+            "field": field,
+            "value": value,
+            "timestamp": datetime.utcnow(),
         }
         await self.broadcast_to_call(message, call_id)
     
@@ -187,8 +275,9 @@ class ConnectionManager:
         """Notify that call summary is ready."""
         message = {
             "type": "summary_ready",
-            "call_id": str(call_id),
-            "summary_id": str(summary_id),
+            "call_id": call_id,
+            "summary_id": summary_id,
+            "timestamp": datetime.utcnow(),
         }
         await self.broadcast_to_call(message, call_id)
     
@@ -201,58 +290,62 @@ class ConnectionManager:
         """Send an error message to all call connections."""
         message = {
             "type": "error",
-            "call_id": str(call_id),
+            "call_id": call_id,
             "error": error,
             "details": details,
+            "timestamp": datetime.utcnow(),
         }
         await self.broadcast_to_call(message, call_id)
     
     def get_connections_for_call(self, call_id: UUID) -> List[WebSocket]:
         """Get all WebSocket connections for a call."""
-        call_id_str = str(call_id)
-        return self._active_connections.get(call_id_str, [])
+        return list(self._active_connections.get(call_id, ()))
     
     def has_connections(self, call_id: UUID) -> bool:
         """Check if a call has any active connections."""
-        call_id_str = str(call_id)
-        return bool(self._active_connections.get(call_id_str))
+        return bool(self._active_connections.get(call_id))
     
     def get_active_calls(self) -> List[str]:
         """Get list of call IDs with active connections."""
-        return list(self._active_connections.keys())
+        return [str(call_id) for call_id in self._active_connections]
     
     def get_connection_count(self, call_id: UUID = None) -> int:
         """Get connection count for a specific call or all calls."""
         if call_id:
-            call_id_str = str(call_id)
-            return len(self._active_connections.get(call_id_str, []))
-        return len(self._all_connections)
+            return len(self._active_connections.get(call_id, ()))
+        return len(self._outboxes)
     
     def get_metadata(self, call_id: UUID) -> Dict:
         """Get metadata for a call's connections."""
-        call_id_str = str(call_id)
-        return self._connection_metadata.get(call_id_str, {})
+        return self._connection_metadata.get(call_id, {})
     
     async def close_all_for_call(self, call_id: UUID) -> None:
         """Close all connections for a call."""
-        call_id_str = str(call_id)
-        
-        if call_id_str in self._active_connections:
-            for connection in self._active_connections[call_id_str][:]:
+        connections = list(self._active_connections.get(call_id, ()))
+        if connections:
+            # Let writers flush what's already queued
+            outboxes = self._outboxes
+            drains = [
+                outboxes[connection][0].join()
+                for connection in connections if connection in outboxes
+            ]
+            if drains:
                 try:
-                    await connection.close()
-                except Exception as e:
-                    logger.error(f"Error closing connection: {e}")
+                    await asyncio.wait_for(asyncio.gather(*drains), CLOSE_DRAIN_TIMEOUT)
+                except asyncio.TimeoutError:
+                    logger.warning(f"Timed out flushing messages for call {call_id}")
+            
+            results = await asyncio.gather(
+                *(connection.close() for connection in connections),
+                return_exceptions=True
+            )
+            for connection, result in zip(connections, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error closing connection: {result}")
                 self.disconnect(connection, call_id)
 
 
-# Singleton instance
-_connection_manager: Optional[ConnectionManager] = None
-
-
+@lru_cache(maxsize=1)
 def get_connection_manager() -> ConnectionManager:
     """Get or create ConnectionManager singleton."""
-    global _connection_manager
-    if _connection_manager is None:
-        _connection_manager = ConnectionManager()
-    return _connection_manager
+    return ConnectionManager()
@@ -3,8 +3,10 @@ Live Call Handler for processing WebSocket messages during calls.
 Handles start, audio chunks, queries, and end call events.
 """
 import json
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Callable, Dict, Any, List
 from uuid import UUID
 from datetime import datetime
 from fastapi import WebSocket
@@ -17,10 +19,15 @@ from models.call import (
     WSMessageType,
 )
 from storage import get_redis_client, get_call_repository
-from websocket.connection_manager import get_connection_manager
+from websocket.connection_manager import get_connection_manager, utcnow_iso
 
 logger = logging.getLogger(__name__)
 
+# Partial (non-final) transcript chunks are written to Redis and sent in
+# batches: once this many are pending, or when the oldest has waited this long
+TRANSCRIPT_BATCH_SIZE = 16
+TRANSCRIPT_BATCH_WAIT = 0.1  # seconds
+
 
 class LiveCallHandler:
     """
@@ -38,6 +45,11 @@ class LiveCallHandler:
         self.repository = get_call_repository()
         self.connection_manager = get_connection_manager()
         self._transcription_service = None  # Lazy load
+        self._answer_query = None  # Lazy load
+        # call_id -> partial transcript chunks waiting to be sent
+        self._pending_chunks: Dict[UUID, List[Dict[str, Any]]] = {}
+        # call_id -> task that flushes the pending chunks after the wait
+        self._flush_timers: Dict[UUID, asyncio.Task] = {}
     
     @property
     def transcription_service(self):
@@ -47,6 +59,31 @@ class LiveCallHandler:
             self._transcription_service = get_transcription_service()
         return self._transcription_service
     
+    @property
+    def answer_query(self) -> Callable[..., Dict[str, Any]]:
+        """
+        Lazy load the push-to-talk answer function, resolved once:
+        answer_query_with_context(query, call_context), or a fallback with
+        the same signature that prepends the context to answer_query.
+        """
+        if self._answer_query is None:
+            try:
+                from orchestration.hybrid_answer import answer_query_with_context
+                self._answer_query = answer_query_with_context
+            except ImportError:
+                # Fallback to regular query if context-aware not available
+                from orchestration.hybrid_answer import answer_query
+                
+                def answer_with_prepended_context(query: str, call_context: Dict[str, Any]) -> Dict[str, Any]:
+                    recent_transcript = call_context.get("recent_transcript")
+                    enhanced_query = f"In the context of a call with {call_context.get('account_name')}: {query}"
+                    if recent_transcript:
+                        enhanced_query = f"Recent conversation:\n{recent_transcript}\n\nQuestion: {query}"
+                    return answer_query(enhanced_query)
+                
+                self._answer_query = answer_with_prepended_context
+        return self._answer_query
+    
     async def handle_message(
         self,
         websocket: WebSocket,
@@ -186,28 +223,37 @@ class LiveCallHandler:
         """
         Callback from transcription service when a transcript chunk is ready.
         """
-        # Store in Redis buffer for real-time context
         chunk_data = {
             "speaker": speaker,
             "text": text,
             "start_time": start_time,
             "end_time": end_time,
             "is_final": is_final,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": utcnow_iso(),
         }
+        
+        # Partials are batched: they reach Redis and the frontend together
+        # when the batch flushes
+        if not is_final:
+            await self._queue_partial_chunk(call_id, chunk_data)
+            return
+        
+        # Finals go out immediately, after any partials queued before them
+        await self._flush_partial_chunks(call_id)
+        
+        # Store in Redis buffer for real-time context
         self.redis.add_transcript_chunk(call_id, chunk_data)
         
         # Store final chunks in repository for permanent storage
-        if is_final:
-            chunk_create = TranscriptChunkCreate(
-                call_id=call_id,
-                speaker=speaker,
-                text=text,
-                start_time=start_time,
-                end_time=end_time,
-                is_final=True,
-            )
-            self.repository.add_transcript_chunk(chunk_create)
+        chunk_create = TranscriptChunkCreate(
+            call_id=call_id,
+            speaker=speaker,
+            text=text,
+            start_time=start_time,
+            end_time=end_time,
+            is_final=True,
+        )
+        self.repository.add_transcript_chunk(chunk_create)
         
         # Send to frontend
         await self.connection_manager.send_transcript_chunk(
@@ -219,6 +265,39 @@ class LiveCallHandler:
             is_final=is_final,
         )
     
+    async def _queue_partial_chunk(self, call_id: UUID, chunk: Dict[str, Any]) -> None:
+        """Queue a partial chunk, flushing when the batch is full"""
+        pending = self._pending_chunks.setdefault(call_id, [])
+        pending.append(chunk)
+        
+        if len(pending) >= TRANSCRIPT_BATCH_SIZE:
+            await self._flush_partial_chunks(call_id)
+        elif call_id not in self._flush_timers:
+            self._flush_timers[call_id] = asyncio.create_task(self._flush_after_wait(call_id))
+    
+    async def _flush_after_wait(self, call_id: UUID) -> None:
+        """Flush a call's partial chunks once the batch wait has passed"""
+        await asyncio.sleep(TRANSCRIPT_BATCH_WAIT)
+        self._flush_timers.pop(call_id, None)
+        try:
+            await self._flush_partial_chunks(call_id)
+        except Exception as e:
+            logger.error(f"Error flushing transcript batch for call {call_id}: {e}")
+    
+    async def _flush_partial_chunks(self, call_id: UUID) -> None:
+        """
+        Write a call's pending partial chunks to Redis in one pipeline and
+        send them as one transcript_batch.
+        """
+        timer = self._flush_timers.pop(call_id, None)
+        if timer is not None:
+            timer.cancel()
+        
+        chunks = self._pending_chunks.pop(call_id, None)
+        if chunks:
+            self.redis.add_transcript_chunks(call_id, chunks)
+            await self.connection_manager.send_transcript_batch(call_id, chunks)
+    
     async def _handle_push_to_talk_query(
         self,
         call_id: UUID,
@@ -240,7 +319,9 @@ class LiveCallHandler:
         
         logger.info(f"Processing push-to-talk query for call {call_id}: {query[:50]}...")
         
-        # Get recent transcript context from Redis
+        # Get recent transcript context from Redis, including partials
+        # still waiting for their batch
+        await self._flush_partial_chunks(call_id)
         recent_transcript = self.redis.get_recent_transcript_text(call_id)
         
         # Get call metadata
@@ -249,9 +330,7 @@ class LiveCallHandler:
         
         # Build context-aware query
         try:
-            from orchestration.hybrid_answer import answer_query_with_context
-            
-            result = answer_query_with_context(
+            result = self.answer_query(
                 query=query,
                 call_context={
                     "recent_transcript": recent_transcript,
@@ -267,23 +346,6 @@ class LiveCallHandler:
                 sources=result.get("sources", []),
                 confidence=result.get("confidence", 1.0),
             )
-            
-        except ImportError:
-            # Fallback to regular query if context-aware not available
-            from orchestration.hybrid_answer import answer_query
-            
-            # Prepend context to query
-            enhanced_query = f"In the context of a call with {account_name}: {query}"
-            if recent_transcript:
-                enhanced_query = f"Recent conversation:\n{recent_transcript}\n\nQuestion: {query}"
-            
-            result = answer_query(enhanced_query)
-            
-            await self.connection_manager.send_query_response(
-                call_id=call_id,
-                answer=result.get("answer", "No answer available"),
-                sources=result.get("sources", []),
-            )
         
         except Exception as e:
             logger.error(f"Error processing query: {e}", exc_info=True)
@@ -311,6 +373,9 @@ class LiveCallHandler:
         # Update Redis status
         self.redis.set_call_status(call_id, CallStatus.ENDED.value)
         
+        # Send any partial transcript still waiting for its batch
+        await self._flush_partial_chunks(call_id)
+        
         # Notify client that call is ending
         await self.connection_manager.send_status_update(
             call_id,
@@ -333,8 +398,14 @@ class LiveCallHandler:
         """
         Generate call summary using LLM.
         """
-        # Get full transcript
-        transcript_text = self.repository.get_full_transcript_text(call_id)
+        # Get full transcript and call metadata. The repository reads run
+        # side by side off the event loop; Redis is used from the loop, as
+        # everywhere else in this handler.
+        transcript_text, call = await asyncio.gather(
+            asyncio.to_thread(self.repository.get_full_transcript_text, call_id),
+            asyncio.to_thread(self.repository.get_call, call_id),
+        )
+        metadata = self.redis.get_call_metadata(call_id)
         
         if not transcript_text:
             logger.warning(f"No transcript found for call {call_id}")
@@ -345,44 +416,31 @@ class LiveCallHandler:
             )
             return
         
-        # Get call metadata
-        call = self.repository.get_call(call_id)
-        metadata = self.redis.get_call_metadata(call_id)
-        
-        # Generate summary using summarization service
+        # Generate summary using summarization service, streaming completed
+        # fields to the client as they are generated
         try:
-            from summarization import generate_call_summary
+            from summarization import stream_call_summary
             
-            summary_data = await generate_call_summary(
+            summary_data = {}
+            async for event in stream_call_summary(
                 transcript=transcript_text,
                 account_name=metadata.get("account_name", call.account_name if call else "Unknown"),
                 deal_id=metadata.get("deal_id", call.deal_id if call else None),
                 duration_minutes=(call.duration_seconds // 60) if call and call.duration_seconds else 0,
-            )
-            
-            # Store summary
-            from models.call import CallSummaryCreate, ActionItemPriority
+            ):
+                if event["type"] == "field":
+                    await self.connection_manager.send_summary_partial(
+                        call_id, event["name"], event["value"]
+                    )
+                elif event["type"] == "final":
+                    summary_data = event["summary"]
             
-            summary_create = CallSummaryCreate(
-                call_id=call_id,
-                executive_summary=summary_data.get("executive_summary", ""),
-                key_points=summary_data.get("key_points", []),
-                pain_points=summary_data.get("pain_points", []),
-                objections=summary_data.get("objections", []),
-                next_steps=summary_data.get("next_steps", ""),
-                deal_health_score=summary_data.get("deal_health_score", 5),
-                deal_health_reason=summary_data.get("deal_health_reason", ""),
+            # Store summary and action items (as the REST endpoints do), then
+            # mark the call as summarized once that has succeeded
+            summary = await asyncio.to_thread(
+                self.repository.save_generated_summary, call_id, summary_data
             )
-            
-            summary = self.repository.create_summary(summary_create)
-            
-            # Store action items
-            action_items = summary_data.get("action_items", [])
-            if action_items:
-                self.repository.create_action_items_batch(call_id, action_items)
-            
-            # Mark call as summarized
-            self.repository.set_call_summarized(call_id)
+            await asyncio.to_thread(self.repository.set_call_summarized, call_id)
             
             # Notify client
             await self.connection_manager.send_summary_ready(call_id, summary.id)
@@ -413,13 +471,8 @@ class LiveCallHandler:
         """
         Add a mock transcript chunk - useful for testing without real audio.
         """
-        # Get current time reference from existing chunks
-        existing_chunks = self.redis.get_transcript_buffer(call_id)
-        
-        if existing_chunks:
-            last_end_time = max(c.get("end_time", 0) for c in existing_chunks)
-        else:
-            last_end_time = 0
+        # Get current time reference from the most recent chunk
+        last_end_time = self.redis.get_latest_end_time(call_id) or 0
         
         if start_time is None:
             start_time = last_end_time + 0.5
@@ -439,13 +492,7 @@ class LiveCallHandler:
         )
 
 
-# Singleton instance
-_live_call_handler: Optional[LiveCallHandler] = None
-
-
+@lru_cache(maxsize=1)
 def get_live_call_handler() -> LiveCallHandler:
     """Get or create LiveCallHandler singleton."""
-    global _live_call_handler
-    if _live_call_handler is None:
-        _live_call_handler = LiveCallHandler()
-    return _live_call_handler
+    return LiveCallHandler()
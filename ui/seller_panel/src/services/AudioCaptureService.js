@@ -18,8 +18,10 @@ export const WSMessageType = {
   
   // Server -> Client
   TRANSCRIPT_CHUNK: 'transcript_chunk',
+  TRANSCRIPT_BATCH: 'transcript_batch',
   QUERY_RESPONSE: 'query_response',
   STATUS_UPDATE: 'status_update',
+  SUMMARY_PARTIAL: 'summary_partial',
   SUMMARY_READY: 'summary_ready',
   ERROR: 'error',
 };
@@ -53,6 +55,7 @@ class AudioCaptureService {
     this.onTranscriptChunk = null;
     this.onQueryResponse = null;
     this.onStatusUpdate = null;
+    this.onSummaryPartial = null;
     this.onSummaryReady = null;
     this.onError = null;
     this.onConnectionStateChange = null;
@@ -407,6 +410,20 @@ class AudioCaptureService {
           }
           break;
           
+        case WSMessageType.TRANSCRIPT_BATCH:
+          if (this.onTranscriptChunk) {
+            for (const chunk of message.chunks || []) {
+              this.onTranscriptChunk({
+                speaker: chunk.speaker,
+                text: chunk.text,
+                startTime: chunk.start_time,
+                endTime: chunk.end_time,
+                isFinal: chunk.is_final,
+              });
+            }
+          }
+          break;
+          
         case WSMessageType.QUERY_RESPONSE:
           if (this.onQueryResponse) {
             this.onQueryResponse({
@@ -426,6 +443,15 @@ class AudioCaptureService {
           }
           break;
           
+        case WSMessageType.SUMMARY_PARTIAL:
+          if (this.onSummaryPartial) {
+            this.onSummaryPartial({
+              field: message.field,
+              value: message.value,
+            });
+          }
+          break;
+          
         case WSMessageType.SUMMARY_READY:
           if (this.onSummaryReady) {
             this.onSummaryReady({
@@ -530,6 +556,13 @@ class AudioCaptureService {
     this.onStatusUpdate = callback;
   }
   
+  /**
+   * Set callback for summary fields streamed before the summary is ready
+   */
+  setOnSummaryPartial(callback) {
+    this.onSummaryPartial = callback;
+  }
+  
   /**
    * Set callback for summary ready
    */